@@ -1,35 +1,49 @@
+import functools
 from typing import Iterable, Self, TYPE_CHECKING, Union
 
+import numpy as np
+from numpy.typing import ArrayLike
+
 
 if TYPE_CHECKING:
-    from simulator.world import Regions2, Tiles2
+    from core.service.topology import Topology
 
 
 class Coordinates:
-    world_radius: int = None
-    region_radius: int = None
-    mirror_centers_cache: dict[tuple[int, int], list[Self]] = {}
-    distance_3_cache: dict[tuple[int, int, bool], int] = {}
-    __slots__ = ["x", "y", "a", "b", "c", "to_2", "to_3"]
-
-    def __init__(self, x: int, y: int) -> None:
-        self.x = x
-        self.y = y
-
-        self.a = x
-        self.b = y
-        self.c = -x - y
-
-        self.to_2 = (self.x, self.y)
-        self.to_3 = (self.a, self.b, self.c)
+    # точки решетки в пределах этого радиуса существуют в единственном экземпляре
+    interning_radius: int = 1
+    interned: dict[tuple[int, int], Self] = {}
+    __slots__ = ["x", "y", "a", "b", "c", "to_2", "to_3", "hash"]
+
+    # экземпляры неизменяемы, поэтому точки решетки переиспользуются (flyweight)
+    def __new__(cls, x: int, y: int) -> Self:
+        key = (x, y)
+        instance = cls.interned.get(key)
+        if instance is None:
+            instance = super().__new__(cls)
+            instance.x = x
+            instance.y = y
+
+            instance.a = x
+            instance.b = y
+            instance.c = -x - y
+
+            instance.to_2 = key
+            instance.to_3 = (instance.a, instance.b, instance.c)
+            instance.hash = hash(key)
+
+            radius = cls.interning_radius
+            if abs(instance.a) <= radius and abs(instance.b) <= radius and abs(instance.c) <= radius:
+                cls.interned[key] = instance
+        return instance
 
     def __hash__(self) -> int:
-        return hash(self.to_2)
+        return self.hash
 
     def __eq__(self, other: Self) -> bool:
-        return self.to_2 == other.to_2
+        # точки вне радиуса интернирования могут существовать в нескольких экземплярах
+        return self is other or self.to_2 == other.to_2
 
-    # todo: add inplace operators
     def __add__(self, other: Self) -> Self:
         return self.__class__(self.x + other.x, self.y + other.y)
 
@@ -48,19 +62,13 @@ class Coordinates:
     def __mul__(self, other: int) -> Self:
         return self.__class__(self.x * other, self.y * other)
 
-    def reset(self) -> None:
-        self.x = ABSOLUTE_CENTER.x
-        self.y = ABSOLUTE_CENTER.y
-
-        self.a = ABSOLUTE_CENTER.a
-        self.b = ABSOLUTE_CENTER.b
-        self.c = ABSOLUTE_CENTER.c
-
-        self.to_2 = ABSOLUTE_CENTER.to_2
-        self.to_3 = ABSOLUTE_CENTER.to_3
-
     def copy(self) -> Self:
-        return self.__class__(self.x, self.y)
+        # экземпляры неизменяемы
+        return self
+
+    @classmethod
+    def set_interning_radius(cls, radius: int) -> None:
+        cls.interning_radius = max(cls.interning_radius, radius)
 
     @classmethod
     def from_2(cls, x: int, y: int) -> Self:
@@ -100,64 +108,71 @@ class Coordinates:
             value = max(abs(self.a - offset.a), abs(self.b - offset.b), abs(self.c - offset.c))
         return value == radius
 
-    def get_distances(self, others: Iterable[Self], cycled: bool = False) -> dict[Self, int]:
-        return {x: self.distance_3(x, cycled) for x in others}
+    def get_distances(self, others: Iterable[Self], topology: "Topology" = None) -> dict[Self, int]:
+        return {x: self.distance_3(x, topology) for x in others}
 
     def get_sorted_distances(
             self,
             others: Iterable[Self],
-            cycled: bool = False,
+            topology: "Topology" = None,
             reverse: bool = False
     ) -> list[tuple[Self, int]]:
-        return sorted(self.get_distances(others, cycled).items(), key = lambda x: x[1], reverse = reverse)
+        return sorted(self.get_distances(others, topology).items(), key = lambda x: x[1], reverse = reverse)
 
-    def get_region_neighbour_centers(self) -> list[Self]:
-        first_y_offset = self.region_radius * 2 + 1
-        first_x = self.region_radius + self.x
-        first_y = self.y - first_y_offset
+    @staticmethod
+    def to_array(coordinates: Iterable[Self]) -> np.ndarray:
+        return np.array([x.to_2 for x in coordinates], dtype = np.int64).reshape(-1, 2)
 
-        first_center = self.__class__(first_x, first_y)
-        centers = [first_center]
-        instance = first_center - self
-        for index in range(5):
-            instance = instance.rotate_60()
-            centers.append(instance + self)
+    @staticmethod
+    def get_distances_array(origins: ArrayLike, targets: ArrayLike, topology: "Topology" = None) -> np.ndarray:
+        """Расстояния от одной (2,) или нескольких (N, 2) точек до точек (M, 2) - массив (M,) или (N, M)"""
 
-        return centers
+        origins = np.asarray(origins, dtype = np.int64)
+        targets = np.asarray(targets, dtype = np.int64)
+        if origins.ndim == 1:
+            delta = targets - origins
+        else:
+            delta = targets - origins[:, np.newaxis, :]
+        x = delta[..., 0]
+        y = delta[..., 1]
+
+        if topology is not None:
+            distances = topology.distance_3_array[topology.get_cycle_keys(x, y)]
+        else:
+            distances = (np.abs(x) + np.abs(y) + np.abs(x + y)) // 2
+        return distances
 
     @classmethod
-    def get_mirror_centers(cls, offset: Self = None) -> list[Self]:
-        if offset is None:
-            offset = ABSOLUTE_CENTER
-        cache_key = (offset.x, offset.y)
-        if cache_key not in cls.mirror_centers_cache:
-            first_y_offset = cls.region_radius * 2 + 1
-            first_x = -cls.region_radius + cls.world_radius + offset.x
-            first_y = first_y_offset + cls.world_radius * (first_y_offset + cls.region_radius) + offset.y
-
-            first_center = cls(first_x, first_y)
-            centers = [first_center]
-            instance = first_center - offset
-            for index in range(5):
-                instance = instance.rotate_60()
-                centers.append(instance + offset)
-            cls.mirror_centers_cache[cache_key] = centers
-        centers = cls.mirror_centers_cache[cache_key]
-
-        return centers
-
-    def fix_to_cycle(self, tiles_2: "Tiles2") -> Self:
+    def get_closest_indexes(
+            cls,
+            origins: ArrayLike,
+            targets: ArrayLike,
+            topology: "Topology" = None
+    ) -> np.ndarray:
+        """Индексы ближайших целей для каждой точки"""
+
+        return cls.get_distances_array(origins, targets, topology).argmin(axis = -1)
+
+    @classmethod
+    def get_sorted_indexes(
+            cls,
+            origins: ArrayLike,
+            targets: ArrayLike,
+            topology: "Topology" = None,
+            reverse: bool = False
+    ) -> np.ndarray:
+        """Индексы целей, упорядоченные по расстоянию, для каждой точки"""
+
+        distances = cls.get_distances_array(origins, targets, topology)
+        if reverse:
+            distances = -distances
+        return distances.argsort(axis = -1, kind = "stable")
+
+    def fix_to_cycle(self, topology: "Topology") -> Self:
         """Зацикливает координаты"""
 
-        if self.x in tiles_2 and self.y in tiles_2[self.x]:
-            instance = self
-        # todo: add caching
-        else:
-            map_center_mirrors = self.get_mirror_centers()
-            distances = self.get_sorted_distances(map_center_mirrors)
-            closest = distances[0][0]
-            instance = self - closest
-        return instance
+        x, y = topology.cycle_array[topology.get_cycle_key(self.x, self.y)].tolist()
+        return self.__class__(x, y)
 
     def rotate_60(self, offset: Self = None, clockwise: bool = True) -> Self:
         if clockwise:
@@ -187,45 +202,102 @@ class Coordinates:
         # return math.dist(self.to_2, other.to_2)
         raise NotImplementedError()
 
-    def distance_3(self, other: "Self", cycled: bool = False) -> int:
+    def distance_3(self, other: "Self", topology: "Topology" = None) -> int:
         """Количество шагов через границы тайлов, чтобы попасть из одного в другой"""
 
-        x = other.x - self.x
-        y = other.y - self.y
-
-        cache_key = (x, y, cycled)
-        if cache_key not in self.distance_3_cache:
-            if cycled:
-                other_mirrors = self.get_mirror_centers(other)
-                distances = self.get_sorted_distances(other_mirrors)
-                value = min(distances[0][1], self.distance_3(other, False))
-            else:
-                value = (abs(self.a - other.a) + abs(self.b - other.b) + abs(self.c - other.c)) // 2
-            self.distance_3_cache[cache_key] = value
-        value = self.distance_3_cache[cache_key]
-
+        if topology is not None:
+            value = topology.distance_3_table[topology.get_cycle_key(other.x - self.x, other.y - self.y)]
+        else:
+            value = (abs(self.a - other.a) + abs(self.b - other.b) + abs(self.c - other.c)) // 2
         return value
 
     @staticmethod
-    def append_layers(
-            objects_2: Union["Tiles2", "Regions2", None],
-            indexes: Iterable["Coordinates"],
-            layers_number: int,
-            real_neighbours: bool = True
-    ) -> set["Coordinates"]:
-        indexes = set(indexes)
-        last_layer = indexes
-        for _ in range(layers_number):
-            new_layer = set()
-            for index in last_layer:
-                if real_neighbours:
-                    new_indexes = (x.coordinates for x in objects_2[index.x][index.y].neighbours)
-                else:
-                    new_indexes = (index + offset for offset in NEIGHBOUR_OFFSETS.values())
-                new_layer.update(new_indexes)
-            indexes.update(new_layer)
-            last_layer = new_layer
-        return indexes
+    @functools.cache
+    def get_range_offsets(radius: int, unit: "Coordinates" = None) -> tuple["Coordinates", ...]:
+        """Смещения всех точек в пределах radius шагов unit по спирали: кольца от центра, каждое обходится подряд"""
+
+        if unit is None:
+            unit = NEIGHBOUR_OFFSETS[5]
+        # углы кольца радиуса 1, соседние углы отличаются на один шаг
+        corners = [unit]
+        for _ in range(5):
+            corners.append(corners[-1].rotate_60())
+
+        offsets = [ABSOLUTE_CENTER]
+        for ring in range(1, radius + 1):
+            for index in range(6):
+                corner = corners[index]
+                step = corners[(index + 1) % 6] - corner
+                for number in range(ring):
+                    offsets.append(corner * ring + step * number)
+        return tuple(offsets)
+
+
+class Vector:
+    """Изменяемый вектор в кубических координатах, операции не создают новых объектов"""
+
+    __slots__ = ["a", "b", "c"]
+
+    def __init__(self, x: int = 0, y: int = 0) -> None:
+        self.a = x
+        self.b = y
+        self.c = -x - y
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}{(self.a, self.b, self.c)}"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+    def __iadd__(self, other: Union[Self, Coordinates]) -> Self:
+        self.a += other.a
+        self.b += other.b
+        self.c += other.c
+        return self
+
+    def __imul__(self, other: int) -> Self:
+        self.a *= other
+        self.b *= other
+        self.c *= other
+        return self
+
+    @property
+    def x(self) -> int:
+        return self.a
+
+    @property
+    def y(self) -> int:
+        return self.b
+
+    @property
+    def to_2(self) -> tuple[int, int]:
+        return self.a, self.b
+
+    def set(self, x: int, y: int) -> None:
+        self.a = x
+        self.b = y
+        self.c = -x - y
+
+    def set_from(self, other: Union[Self, Coordinates]) -> None:
+        self.a = other.a
+        self.b = other.b
+        self.c = other.c
+
+    def add(self, x: int, y: int) -> None:
+        self.a += x
+        self.b += y
+        self.c -= x + y
+
+    def reset(self) -> None:
+        self.a = 0
+        self.b = 0
+        self.c = 0
+
+    def rotate_60(self, clockwise: bool = True) -> None:
+        if clockwise:
+            self.a, self.b, self.c = -self.b, -self.c, -self.a
+        else:
+            self.a, self.b, self.c = -self.c, -self.a, -self.b
 
 
 ABSOLUTE_CENTER = Coordinates(0, 0)
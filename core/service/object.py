@@ -1,12 +1,8 @@
 from typing import Any, Self
 
-from arcade import Sprite, color
-from arcade.types import Color
-
 from core.service import settings
 from core.service.logger import Logger
 from core.service.settings import Settings
-from core.service.texture import Texture
 
 
 class ThirdPartyMixin:
@@ -14,15 +10,33 @@ class ThirdPartyMixin:
     logger = Logger(__qualname__)
 
 
+class IdAllocator:
+    """Счетчики идентификаторов по классам объектов
+
+    Принадлежит миру, поэтому миры в одном процессе нумеруют свои объекты независимо друг от друга.
+    """
+
+    def __init__(self) -> None:
+        self.counters: dict[type, int] = {}
+
+    def allocate(self, object_class: type) -> int:
+        object_id = self.counters.get(object_class, 0)
+        self.counters[object_class] = object_id + 1
+        return object_id
+
+
 class Object:
     settings = settings.Settings()
     counter = 0
     logger = Logger(__qualname__)
 
-    def __init__(self) -> None:
+    def __init__(self, object_id: int = None) -> None:
         super().__init__()
-        self.id = self.counter
-        self.__class__.counter += 1
+        # объекты, от идентификаторов которых зависит симуляция, получают их от IdAllocator своего мира
+        if object_id is None:
+            object_id = self.counter
+            self.__class__.counter += 1
+        self.id = object_id
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}({self.id})"
@@ -34,23 +48,6 @@ class Object:
         return self.id < other.id
 
 
-class ProjectionObject(Sprite, Object):
-    main_color: Color = color.WHITE
-    border_color: Color = color.BLACK
-    background_color: Color = color.TRANSPARENT_BLACK
-
-    def __init__(self) -> None:
-        texture = Texture.create_hexagon(
-            25,
-            1,
-            self.main_color,
-            self.border_color,
-            self.background_color
-        )
-        super().__init__(texture, 1, 0, 0, 0)
-        self.selected = False
-
-
 class PhysicalObject(Object):
     def on_update(self, *args, **kwargs) -> Any:
         raise NotImplementedError()
@@ -0,0 +1,22 @@
+from arcade import Sprite, color
+from arcade.types import Color
+
+from core.service.object import Object
+from core.service.texture import Texture
+
+
+class ProjectionObject(Sprite, Object):
+    main_color: Color = color.WHITE
+    border_color: Color = color.BLACK
+    background_color: Color = color.TRANSPARENT_BLACK
+
+    def __init__(self) -> None:
+        texture = Texture.create_hexagon(
+            25,
+            1,
+            self.main_color,
+            self.border_color,
+            self.background_color
+        )
+        super().__init__(texture, 1, 0, 0, 0)
+        self.selected = False
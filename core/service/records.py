@@ -0,0 +1,42 @@
+import os
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+
+def write_records(path: Path, records: Iterable[np.ndarray]) -> None:
+    """Записывает массивы в файл последовательностью записей в формате .npy"""
+
+    path.parent.mkdir(parents = True, exist_ok = True)
+    # запись во временный файл, чтобы читатель не увидел недописанный файл, а при падении остался предыдущий
+    temporary_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(temporary_path, "wb") as file:
+        for record in records:
+            np.lib.format.write_array(file, np.ascontiguousarray(record))
+    os.replace(temporary_path, path)
+
+
+def read_records(path: Path, number: int, memory_map: bool = False) -> Iterator[np.ndarray]:
+    """Читает по одной number записей в формате .npy, на обрезанном или поврежденном файле - ValueError
+
+    memory_map - массивы отображаются в память вместо чтения.
+    """
+
+    file_size = path.stat().st_size
+    with open(path, "rb") as file:
+        for _ in range(number):
+            if np.lib.format.read_magic(file) == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+            offset = file.tell()
+            size = int(np.prod(shape))
+            if offset + size * dtype.itemsize > file_size:
+                raise ValueError(f"File {path} is truncated")
+            order = "F" if fortran_order else "C"
+            if memory_map and size > 0:
+                yield np.memmap(path, dtype, "r", offset, shape, order)
+            else:
+                yield np.fromfile(file, dtype, size).reshape(shape, order = order)
+            file.seek(offset + size * dtype.itemsize)
@@ -22,3 +22,39 @@ class Settings(Singleton):
 
         self.RESOURCES_FOLDER = "resources"
         self.IMAGES_FOLDER = f"{self.RESOURCES_FOLDER}/images"
+
+        self.CACHE_FOLDER = "cache"
+        self.TOPOLOGY_CACHE_FOLDER = f"{self.CACHE_FOLDER}/topology"
+        self.USE_TOPOLOGY_CACHE = True
+        # регионы и тайлы создаются при первом обращении к ним - для очень больших миров
+        self.LAZY_REGIONS = False
+
+        # 1 - регионы обрабатываются в потоке симуляции, > 1 - фазы RegionScheduler обрабатываются потоками,
+        # что ускоряет симуляцию только в интерпретаторе без GIL
+        self.SIMULATION_THREADS = 1
+        # > 1 - регионы делятся на шарды, обрабатываемые отдельными процессами;
+        # каждый процесс строит весь мир - таблицы топологии, регионы и тайлы всей карты и столбцы всего населения,
+        # поэтому его память растет с размером карты, а не шарда, LAZY_REGIONS уменьшает только долю регионов и тайлов
+        self.SIMULATION_PROCESSES = 1
+        # с этого количества слушателей крик обрабатывается векторно, иначе - по одному существу, результаты совпадают
+        self.CRY_BATCH_SIZE = 64
+        # регион, в котором существ больше этого, делится для поиска слушателей на тайлы и сливается обратно,
+        # когда существ становится меньше половины порога, результаты не меняются
+        self.CRY_SPLIT_SIZE = 8
+        # "objects" - каждое существо действует само, "arrays" - все существа тика обрабатываются столбцами NumPy
+        self.CREATURE_ENGINE = "objects"
+        # кто слышит крик, кроме существ дальше своего hear_radius:
+        # "layers" - существа регионов в пределах scream_radius // region_radius + 1 слоев вокруг региона кричащего,
+        # "radius" - только существа в пределах scream_radius тайлов от кричащего, окрестность меньше и не зависит
+        # от положения кричащего в регионе, но результаты отличаются от "layers"
+        self.SCREAM_LISTENERS = "layers"
+        # "creatures" - крик доходит до каждого слушателя в радиусе крика,
+        # "regions" - слушатели берут лучшие за тик крики окрестных регионов о своей финальной базе
+        self.SCREAM_PROPAGATION = "creatures"
+        # количество случайных чисел, создаваемых CounterRandom за раз, блок занимает 8 байт на число у каждого объекта,
+        # больший блок немного ускоряет выдачу чисел, но при 100 тысячах существ занимает заметную память
+        self.RANDOM_BLOCK_SIZE = 32
+
+        self.CHECKPOINT_FOLDER = "checkpoints"
+        # период снимков мира в тиках, 0 - снимки не делаются
+        self.CHECKPOINT_PERIOD = 0
@@ -0,0 +1,212 @@
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from core.service import settings
+from core.service.coordinates import ABSOLUTE_CENTER, Coordinates
+from core.service.records import read_records, write_records
+
+
+class Topology:
+    """Геометрия зацикленного мира: параметры и производные от них таблицы"""
+
+    def __init__(self, world_radius: int, region_radius: int) -> None:
+        # количество радиусов региона в радиусе мира
+        self.world_radius = world_radius
+        # в тайлах
+        self.region_radius = region_radius
+        self.radius = self.world_radius * (self.region_radius * 2 + 1) + self.region_radius
+        Coordinates.set_interning_radius(self.radius)
+
+        # смещение к первому соседнему региону
+        self.region_unit = Coordinates(self.region_radius, -(self.region_radius * 2 + 1))
+        self.region_neighbour_offsets = [self.region_unit]
+        for _ in range(5):
+            self.region_neighbour_offsets.append(self.region_neighbour_offsets[-1].rotate_60())
+
+        self.mirror_centers = self.get_mirror_centers()
+        # базис решетки зеркальных центров в эрмитовой нормальной форме: (p, 0), (q, r)
+        self.cycle_basis = self.get_cycle_basis()
+        # количество тайлов
+        self.size = self.cycle_basis[0] * self.cycle_basis[2]
+        # (size, 2) канонические координаты тайла по ключу класса вычетов
+        self.cycle_array: np.ndarray | None = None
+        # зацикленные расстояния по ключу класса вычетов разности координат
+        self.distance_3_table: list[int] | None = None
+        self.distance_3_array: np.ndarray | None = None
+        # (N, 6) номера соседей в порядке NEIGHBOUR_OFFSETS и region_neighbour_offsets
+        self.tile_neighbours: np.ndarray | None = None
+        self.region_neighbours: np.ndarray | None = None
+        # радиус -> смещения тайлов шестиугольника и зацикленные расстояния до них
+        self.ranges: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        # слои -> смещения тайлов окрестных регионов от центра региона
+        self.region_ranges: dict[int, np.ndarray] = {}
+        # слои -> (R, K) окрестные регионы каждого региона
+        self.layer_tables: dict[int, np.ndarray] = {}
+
+    def get_mirror_centers(self, offset: Coordinates = None) -> list[Coordinates]:
+        if offset is None:
+            offset = ABSOLUTE_CENTER
+
+        first_y_offset = self.region_radius * 2 + 1
+        first_x = -self.region_radius + self.world_radius + offset.x
+        first_y = first_y_offset + self.world_radius * (first_y_offset + self.region_radius) + offset.y
+
+        first_center = Coordinates(first_x, first_y)
+        centers = [first_center]
+        instance = first_center - offset
+        for index in range(5):
+            instance = instance.rotate_60()
+            centers.append(instance + offset)
+
+        return centers
+
+    def get_cycle_basis(self) -> tuple[int, int, int]:
+        first, second = self.mirror_centers[:2]
+        # расширенный алгоритм Евклида: u * first.y + v * second.y == r
+        old_r, r = first.y, second.y
+        old_u, u = 1, 0
+        old_v, v = 0, 1
+        while r != 0:
+            quotient = old_r // r
+            old_r, r = r, old_r - quotient * r
+            old_u, u = u, old_u - quotient * u
+            old_v, v = v, old_v - quotient * v
+        if old_r < 0:
+            old_r, old_u, old_v = -old_r, -old_u, -old_v
+        r = old_r
+        p = abs(second.y // r * first.x - first.y // r * second.x)
+        q = (old_u * first.x + old_v * second.x) % p
+        return p, q, r
+
+    def get_cycle_key(self, x: int, y: int) -> int:
+        """Номер класса вычетов точки по модулю решетки зеркальных центров"""
+
+        p, q, r = self.cycle_basis
+        shift, y = divmod(y, r)
+        return y * p + (x - shift * q) % p
+
+    def get_cycle_keys(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Векторизованный get_cycle_key"""
+
+        p, q, r = self.cycle_basis
+        # решетка зеркальных центров обычно циклическая, тогда деление на r не нужно
+        if r == 1:
+            return (x - y * q) % p
+        shift, y = np.divmod(y, r)
+        return y * p + (x - shift * q) % p
+
+    def set_cycle_table(self, coordinates: np.ndarray) -> None:
+        """coordinates - (N, 2) координаты всех тайлов карты"""
+
+        keys = self.get_cycle_keys(coordinates[:, 0], coordinates[:, 1])
+        assert (np.bincount(keys, minlength = self.size) == 1).all(), "Tiles do not cover the map exactly once"
+        self.cycle_array = np.empty((self.size, 2), dtype = np.int64)
+        self.cycle_array[keys] = coordinates
+
+        # канонические координаты лежат в карте с центром в начале координат,
+        # поэтому ближайший образ - это либо сама точка, либо ее сдвиг к одному из зеркальных центров
+        origins = Coordinates.to_array([ABSOLUTE_CENTER, *self.mirror_centers])
+        self.distance_3_array = Coordinates.get_distances_array(origins, self.cycle_array)
+        self.distance_3_array = self.distance_3_array.min(axis = 0)
+        self.distance_3_table = self.distance_3_array.tolist()
+
+    def get_range(self, radius: int) -> tuple[np.ndarray, np.ndarray]:
+        """Смещения (N, 2) всех тайлов в пределах radius шагов и расстояния (N,) до них, каждый тайл один раз"""
+
+        if radius not in self.ranges:
+            offsets = Coordinates.to_array(Coordinates.get_range_offsets(radius))
+            keys = self.get_cycle_keys(offsets[:, 0], offsets[:, 1])
+            # на карте меньше шестиугольника разные смещения ведут на один тайл, остается одно из них
+            _, first = np.unique(keys, return_index = True)
+            self.ranges[radius] = (offsets[first], self.distance_3_array[keys[first]])
+        return self.ranges[radius]
+
+    def get_region_range(self, layers: int) -> np.ndarray:
+        """Смещения (N, 2) от центра региона всех тайлов регионов в пределах layers слоев, каждый тайл один раз"""
+
+        if layers not in self.region_ranges:
+            region_offsets = Coordinates.to_array(Coordinates.get_range_offsets(layers, self.region_unit))
+            tile_offsets = Coordinates.to_array(Coordinates.get_range_offsets(self.region_radius))
+            offsets = (region_offsets[:, np.newaxis, :] + tile_offsets).reshape(-1, 2)
+            # на маленькой карте окрестность накрывает один регион несколько раз
+            _, first = np.unique(self.get_cycle_keys(offsets[:, 0], offsets[:, 1]), return_index = True)
+            self.region_ranges[layers] = offsets[np.sort(first)]
+        return self.region_ranges[layers]
+
+    def get_layer_table(self, centers: np.ndarray, indexes: np.ndarray, layers: int) -> np.ndarray:
+        """(R, K) номера регионов в пределах layers слоев вокруг регионов с центрами centers (R, 2),
+        упорядоченные по возрастанию, повторы на маленькой карте заменены на -1
+
+        indexes - номер региона по ключу класса вычетов его центра.
+        """
+
+        if layers not in self.layer_tables:
+            offsets = Coordinates.get_range_offsets(layers, self.region_unit)
+            table = np.sort(self.get_neighbour_table(centers, indexes, offsets), axis = 1)
+            table[:, 1:][table[:, 1:] == table[:, :-1]] = -1
+            self.layer_tables[layers] = table
+        return self.layer_tables[layers]
+
+    def get_scream_layers(self, scream_radius: int) -> int:
+        """Слои регионов вокруг региона кричащего, существа которых слышат крик в режиме "layers" у SCREAM_LISTENERS"""
+
+        return scream_radius // self.region_radius + 1
+
+    def get_region_offsets(self, distance: int) -> tuple[Coordinates, ...]:
+        """Смещения центров регионов не дальше distance тайлов от центра региона, по спирали, первое - нулевое"""
+
+        # кольцо регионов с номером k не ближе k * region_radius тайлов от центра
+        offsets = Coordinates.get_range_offsets(distance // self.region_radius + 1, self.region_unit)
+        return tuple(x for x in offsets if x.distance_3(ABSOLUTE_CENTER) <= distance)
+
+    def get_neighbour_table(
+            self,
+            coordinates: np.ndarray,
+            indexes: np.ndarray,
+            offsets: Sequence[Coordinates]
+    ) -> np.ndarray:
+        """Номера соседей (N, len(offsets)) для точек (N, 2) по отображению ключ класса вычетов -> номер"""
+
+        neighbours = coordinates[:, np.newaxis, :] + Coordinates.to_array(offsets)
+        return indexes[self.get_cycle_keys(neighbours[..., 0], neighbours[..., 1])]
+
+
+class TopologyCache:
+    """Файл с рассчитанной геометрией карты, массивы загружаются через отображение в память"""
+
+    settings = settings.Settings()
+    # увеличивается при изменении состава или смысла массивов
+    version = 2
+    array_names = ("region_centers", "tile_coordinates", "tile_regions", "region_neighbours", "tile_neighbours")
+
+    def __init__(self, world_radius: int, region_radius: int) -> None:
+        self.world_radius = world_radius
+        self.region_radius = region_radius
+        self.path = Path(self.settings.TOPOLOGY_CACHE_FOLDER) / f"{world_radius}_{region_radius}.topology"
+
+    @property
+    def header(self) -> np.ndarray:
+        return np.array([self.version, self.world_radius, self.region_radius], dtype = np.int64)
+
+    def load(self) -> dict[str, np.ndarray] | None:
+        """Файл - последовательность записей в формате .npy: заголовок и массивы из array_names"""
+
+        if not self.path.exists():
+            return None
+
+        records = read_records(self.path, len(self.array_names) + 1, True)
+        try:
+            if not np.array_equal(next(records), self.header):
+                return None
+            arrays = dict(zip(self.array_names, records))
+        # недописанный или обрезанный файл - геометрия рассчитывается и сохраняется заново
+        except ValueError:
+            return None
+        finally:
+            records.close()
+        return arrays
+
+    def save(self, arrays: dict[str, np.ndarray]) -> None:
+        write_records(self.path, (self.header, *(arrays[name] for name in self.array_names)))
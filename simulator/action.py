@@ -10,8 +10,8 @@ if TYPE_CHECKING:
 
 
 class Action(Object):
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, object_id: int) -> None:
+        super().__init__(object_id)
         self.period: float | None = (self.id % 3) + 3
         self.timer: float = 0
 
@@ -21,35 +21,17 @@ class Action(Object):
 
 class Move(Action):
     def execute(self, world_object: Union["Base", "Creature"]) -> Union["WorldObject", None]:
-        projections = {}
+        direction = world_object.direction
+        new_tiles = []
         blocker = None
         for tile in world_object.tiles:
-            new_tile = tile.neighbours[world_object.direction]
+            new_tile = tile.neighbours[direction]
             if new_tile.object is None or new_tile.object is world_object:
-                projections[new_tile] = world_object.projections[tile]
+                new_tiles.append(new_tile)
             else:
                 blocker = new_tile.object
                 break
         else:
-            for tile in world_object.tiles:
-                tile.object = None
-            for new_tile, projection in projections.items():
-                new_tile.object = world_object
-                projection.tile_projection = new_tile.projection
-                projection.position = new_tile.projection.position
-
-            old_region = world_object.center_tile.region
-            world_object.center_tile = world_object.center_tile.neighbours[world_object.direction]
-            new_region = world_object.center_tile.region
-            world_object.projections = projections
-            world_object.tiles = set(world_object.projections)
-
-            if old_region != new_region:
-                if world_object in old_region.bases:
-                    old_region.bases.remove(world_object)
-                    new_region.bases.append(world_object)
-                else:
-                    old_region.creatures.remove(world_object)
-                    new_region.creatures.append(world_object)
+            world_object.relocate(world_object.center_tile.neighbours[direction], new_tiles)
 
         return blocker
@@ -0,0 +1,302 @@
+import itertools
+import math
+from typing import Iterable, TYPE_CHECKING, Union
+
+import numpy as np
+
+from core.service.coordinates import Coordinates
+from core.service.object import Object
+
+
+if TYPE_CHECKING:
+    from core.service.topology import Topology
+    from simulator.creature import Creature
+    from simulator.screams import RegionScreams
+    from simulator.tile import Tile
+    from simulator.world import BaseSet
+    from simulator.world_object import WorldObject
+
+
+class Audience(Object):
+    """Состояние существ, нужное для криков, в виде столбцов и поиск слушателей по регионам
+
+    Регион, в котором больше CRY_SPLIT_SIZE существ, ищет слушателей по тайлам. Строка существа - его идентификатор.
+    """
+
+    def __init__(self, topology: "Topology") -> None:
+        super().__init__()
+        self.topology = topology
+        # существо по строке, None - существо в другом шарде
+        self.creatures: list[Union["Creature", None]] = []
+        self.bases: "BaseSet" = []
+        self.base_columns: dict["WorldObject", int] = {}
+
+        self.present = np.empty(0, dtype = np.bool_)
+        self.x = np.empty(0, dtype = np.int64)
+        self.y = np.empty(0, dtype = np.int64)
+        self.finish_bases = np.empty(0, dtype = np.int64)
+        self.hear_radiuses = np.empty(0, dtype = np.int64)
+        self.act_periods = np.empty(0, dtype = np.int64)
+        self.act_remainders = np.empty(0, dtype = np.int64)
+        # inf - существо ничего не слышало
+        self.heard_distances = np.empty(0, dtype = np.float64)
+        # ключ класса вычетов тайла существа и обратное отображение: ключ тайла -> существо на нем или -1
+        self.keys = np.empty(0, dtype = np.int64)
+        self.tile_rows = np.empty(0, dtype = np.int32)
+
+        # ключ класса вычетов тайла -> номер региона и номер тайла в регионе
+        self.key_regions = np.empty(0, dtype = np.int64)
+        self.key_tiles = np.empty(0, dtype = np.int64)
+        # (R, 2) центры регионов и (T, 2) смещения тайлов от центра региона
+        self.region_centers = np.empty((0, 2), dtype = np.int64)
+        self.tile_offsets = np.empty((0, 2), dtype = np.int64)
+        self.region_rows: list[set[int]] = []
+        self.region_counts = np.empty(0, dtype = np.int64)
+        # регионы, существа которых ищутся по тайлам
+        self.region_split = np.empty(0, dtype = np.bool_)
+        # радиус -> (R, K) регионы по смещениям от центра региона и (T, K) - какие из них могут оказаться в радиусе
+        # от тайла региона, одинаковые для всех регионов
+        self.range_tables: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        # на маленькой карте регион встречается по нескольким смещениям
+        self.range_repeats: dict[int, bool] = {}
+        # слои -> (R, K) окрестные регионы, повторы заменены на -1
+        self.layer_tables: dict[int, np.ndarray] = {}
+
+    def init(
+            self,
+            creatures: list["Creature"],
+            bases: "BaseSet",
+            rows_number: int,
+            key_regions: np.ndarray,
+            region_centers: np.ndarray
+    ) -> None:
+        """rows_number - население мира, у шарда существ меньше
+
+        key_regions - номер региона по ключу класса вычетов тайла, region_centers - (R, 2) центры регионов.
+        """
+
+        self.creatures = [None] * rows_number
+        self.bases = bases
+        self.base_columns = {base: column for column, base in enumerate(bases)}
+
+        self.present = np.zeros(rows_number, dtype = np.bool_)
+        self.x = np.zeros(rows_number, dtype = np.int64)
+        self.y = np.zeros(rows_number, dtype = np.int64)
+        self.finish_bases = np.zeros(rows_number, dtype = np.int64)
+        self.hear_radiuses = np.zeros(rows_number, dtype = np.int64)
+        self.act_periods = np.ones(rows_number, dtype = np.int64)
+        self.act_remainders = np.zeros(rows_number, dtype = np.int64)
+        # inf - существо ничего не слышало
+        self.heard_distances = np.full(rows_number, math.inf)
+        self.keys = np.full(rows_number, -1, dtype = np.int64)
+        self.tile_rows = np.full(self.topology.size, -1, dtype = np.int32)
+
+        self.key_regions = key_regions
+        self.region_centers = region_centers
+        self.tile_offsets = Coordinates.to_array(Coordinates.get_range_offsets(self.topology.region_radius))
+        tiles = region_centers[:, np.newaxis, :] + self.tile_offsets
+        self.key_tiles = np.zeros(self.topology.size, dtype = np.int64)
+        self.key_tiles[self.topology.get_cycle_keys(tiles[..., 0], tiles[..., 1])] = np.arange(len(self.tile_offsets))
+        self.region_rows = [set() for _ in range(len(region_centers))]
+        self.region_counts = np.zeros(len(region_centers), dtype = np.int64)
+        self.region_split = np.zeros(len(region_centers), dtype = np.bool_)
+        for creature in creatures:
+            self.add(creature)
+
+    def add(self, creature: "Creature") -> None:
+        row = creature.id
+        self.creatures[row] = creature
+        self.present[row] = True
+        self.hear_radiuses[row] = creature.hear_radius
+        self.act_periods[row] = creature.act_period
+        self.act_remainders[row] = creature.act_remainder
+        self.update((creature,))
+
+    def remove(self, creature: "Creature") -> None:
+        row = creature.id
+        if self.keys[row] >= 0:
+            self.leave(row, self.keys[row])
+            self.keys[row] = -1
+        self.creatures[row] = None
+        self.present[row] = False
+
+    def enter(self, row: int, key: int) -> None:
+        self.keys[row] = key
+        self.tile_rows[key] = row
+        region = self.key_regions[key]
+        self.region_rows[region].add(row)
+        self.region_counts[region] += 1
+        if self.region_counts[region] > self.settings.CRY_SPLIT_SIZE:
+            self.region_split[region] = True
+
+    def leave(self, row: int, key: int) -> None:
+        # тайл мог быть уже занят другим существом, обновленным раньше
+        if self.tile_rows[key] == row:
+            self.tile_rows[key] = -1
+        region = self.key_regions[key]
+        self.region_rows[region].discard(row)
+        self.region_counts[region] -= 1
+        # порог слияния ниже порога деления, чтобы регион на границе не делился и не сливался каждый тик
+        if self.region_counts[region] < self.settings.CRY_SPLIT_SIZE // 2:
+            self.region_split[region] = False
+
+    def update(self, world_objects: Iterable["WorldObject"]) -> None:
+        """Переносит в столбцы изменения существ, базы пропускаются"""
+
+        for world_object in world_objects:
+            if world_object.is_creature:
+                row = world_object.id
+                center = world_object.center_tile
+                self.x[row] = center.x
+                self.y[row] = center.y
+                key = self.topology.get_cycle_key(center.x, center.y)
+                if key != self.keys[row]:
+                    if self.keys[row] >= 0:
+                        self.leave(row, self.keys[row])
+                    self.enter(row, key)
+                self.finish_bases[row] = self.base_columns[world_object.finish_base]
+                if world_object.heard_distance is None:
+                    self.heard_distances[row] = math.inf
+                else:
+                    self.heard_distances[row] = world_object.heard_distance
+
+    def get_distances(self, center: "Tile", x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Зацикленные расстояния от тайла до точек"""
+
+        return self.topology.distance_3_array[self.topology.get_cycle_keys(x - center.x, y - center.y)]
+
+    def get_range_tables(self, radius: int) -> tuple[np.ndarray, np.ndarray]:
+        if radius not in self.range_tables:
+            topology = self.topology
+            # тайл не дальше region_radius от центра своего региона
+            offsets = topology.get_region_offsets(radius + topology.region_radius * 2)
+            regions = topology.get_neighbour_table(self.region_centers, self.key_regions, offsets)
+            self.range_repeats[radius] = bool((np.diff(np.sort(regions, axis = 1), axis = 1) == 0).any())
+            # расстояния без зацикливания не меньше зацикленных, а более близкий образ региона - другое смещение
+            reach = Coordinates.get_distances_array(self.tile_offsets, Coordinates.to_array(offsets))
+            self.range_tables[radius] = (regions, reach <= radius + topology.region_radius)
+        return self.range_tables[radius]
+
+    def get_layer_table(self, layers: int) -> np.ndarray:
+        if layers not in self.layer_tables:
+            self.layer_tables[layers] = self.topology.get_layer_table(self.region_centers, self.key_regions, layers)
+        return self.layer_tables[layers]
+
+    @staticmethod
+    def get_rows(row_sets: Iterable[set[int]], repeats: bool = False) -> np.ndarray:
+        rows = np.fromiter(itertools.chain.from_iterable(row_sets), dtype = np.int64)
+        # порядок множеств зависит от истории переходов, поэтому строки упорядочиваются
+        if repeats:
+            rows = np.unique(rows)
+        else:
+            rows.sort()
+        return rows
+
+    def get_split_rows(self, keys: np.ndarray, all_split: bool) -> tuple[np.ndarray, np.ndarray]:
+        """Существа на тайлах разделенных регионов и их номера среди keys"""
+
+        rows = self.tile_rows[keys]
+        found = rows >= 0
+        if not all_split:
+            found &= self.region_split[self.key_regions[keys]]
+        found = np.flatnonzero(found)
+        return rows[found].astype(np.int64), found
+
+    def get_creatures(self, center: "Tile", radius: int) -> tuple[np.ndarray, np.ndarray]:
+        """Номера существ в пределах radius шагов от тайла и зацикленные расстояния до них, каждое существо один раз"""
+
+        regions, reach = self.get_range_tables(radius)
+        regions = regions[center.region.index][reach[self.key_tiles[self.topology.get_cycle_key(center.x, center.y)]]]
+        regions = regions[self.region_counts[regions] > 0]
+        split = self.region_split[regions]
+
+        all_split = split.all()
+        if all_split:
+            rows = np.empty(0, dtype = np.int64)
+            distances = rows
+        else:
+            rows = self.get_rows((self.region_rows[x] for x in regions[~split].tolist()), self.range_repeats[radius])
+            distances = self.get_distances(center, self.x[rows], self.y[rows])
+            found = distances <= radius
+            rows = rows[found]
+            distances = distances[found]
+        if split.any():
+            offsets, tile_distances = self.topology.get_range(radius)
+            split_rows, found = self.get_split_rows(
+                self.topology.get_cycle_keys(offsets[:, 0] + center.x, offsets[:, 1] + center.y),
+                all_split
+            )
+            rows = np.concatenate((rows, split_rows))
+            distances = np.concatenate((distances, tile_distances[found]))
+        return rows, distances
+
+    def get_region_creatures(self, center: "Tile", layers: int) -> tuple[np.ndarray, np.ndarray]:
+        """Номера существ регионов в пределах layers слоев от региона тайла и зацикленные расстояния до них"""
+
+        region = center.region
+        regions = self.get_layer_table(layers)[region.index]
+        regions = regions[regions >= 0]
+        regions = regions[self.region_counts[regions] > 0]
+        split = self.region_split[regions]
+
+        all_split = split.all()
+        if all_split:
+            rows = np.empty(0, dtype = np.int64)
+        else:
+            rows = self.get_rows(self.region_rows[x] for x in regions[~split].tolist())
+        if split.any():
+            offsets = self.topology.get_region_range(layers)
+            split_rows, _ = self.get_split_rows(
+                self.topology.get_cycle_keys(offsets[:, 0] + region.x, offsets[:, 1] + region.y),
+                all_split
+            )
+            rows = np.concatenate((rows, split_rows))
+        return rows, self.get_distances(center, self.x[rows], self.y[rows])
+
+    def cry(self, crier: "Creature", rows: np.ndarray, crier_distances: np.ndarray) -> list["Creature"]:
+        """То же, что и Creature.cry_each, - каждое существо встречается в rows один раз, поэтому порядок не важен"""
+
+        center = crier.center_tile
+        counters = np.array([crier.bases_reach_counter[x] for x in self.bases], dtype = np.int64)
+        base_distances = crier_distances + counters[self.finish_bases[rows]]
+        heard = ((crier_distances <= self.hear_radiuses[rows])
+                 & (base_distances < self.heard_distances[rows])
+                 & (rows != crier.id))
+
+        listeners = []
+        for index in np.flatnonzero(heard).tolist():
+            listener = self.creatures[rows[index]]
+            listener.heard_distance = int(base_distances[index])
+            listener.heard_tile = center
+            self.heard_distances[rows[index]] = listener.heard_distance
+            listeners.append(listener)
+        return listeners
+
+    def propagate(self, screams: "RegionScreams", time: int, listeners: np.ndarray = None) -> None:
+        """Крики существ, действовавших в тик time, через регионы - после обработки всех регионов тика
+
+        listeners - строки слушателей, по умолчанию - все известные существа.
+        """
+
+        criers = np.flatnonzero(self.present & (time % self.act_periods == self.act_remainders))
+        if listeners is None:
+            listeners = np.flatnonzero(self.present)
+        counters = np.array(
+            [list(self.creatures[x].bases_reach_counter.values()) for x in criers.tolist()],
+            dtype = np.int64
+        ).reshape(len(criers), len(self.bases))
+        listeners, base_distances, sources = screams.propagate(
+            criers,
+            counters,
+            listeners,
+            self.x,
+            self.y,
+            self.finish_bases,
+            self.hear_radiuses,
+            self.heard_distances
+        )
+        self.heard_distances[listeners] = base_distances
+        for listener, base_distance, source in zip(listeners.tolist(), base_distances.tolist(), sources.tolist()):
+            creature = self.creatures[listener]
+            creature.heard_distance = base_distance
+            creature.heard_tile = self.creatures[source].center_tile
@@ -1,9 +1,6 @@
-import random
-from typing import Any, TYPE_CHECKING
+from typing import Self, TYPE_CHECKING
 
-from arcade import color
-
-from simulator.world_object import WorldObject, WorldObjectProjection
+from simulator.world_object import WorldObject
 
 
 if TYPE_CHECKING:
@@ -11,25 +8,21 @@ if TYPE_CHECKING:
     from simulator.world import Regions2
 
 
-class BaseProjection(WorldObjectProjection):
-    main_color = color.RED_BROWN
-
-
 class Base(WorldObject):
-    projection_class = BaseProjection
-    projections: dict["Tile", projection_class]
     radius = 10
     is_base = True
 
-    def __init__(self, center_tile: "Tile", time: int) -> None:
-        super().__init__(center_tile, time)
+    def __init__(self, center_tile: "Tile", time: int, world_random_key: int, object_id: int, action_id: int) -> None:
+        super().__init__(center_tile, time, world_random_key, object_id, action_id)
         self.direction_reset_period = 200
         self.scream_radius = 10
 
-    def on_update(self, time: int, regions_2: "Regions2") -> Any:
+    def on_update(self, time: int, regions_2: "Regions2") -> list[Self]:
+        """Возвращает объекты, измененные за действие"""
+
         delta_time = time - self.last_acting_time
         self.last_acting_time = time
-        self.direction = random.randint(0, 5)
+        self.direction = self.random_generator.randint(0, 5)
 
         action = self.move
         action.timer += delta_time
@@ -43,3 +36,4 @@ class Base(WorldObject):
             action.timer -= action.period
 
         self.age += delta_time
+        return [self]
@@ -0,0 +1,183 @@
+import json
+import math
+import queue
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from core.service.object import Object
+from core.service.records import read_records, write_records
+from simulator.world_object import WorldObject
+
+
+if TYPE_CHECKING:
+    from simulator.world import World
+
+
+class Checkpoint(Object):
+    """Полное состояние мира в виде массивов, геометрия карты не сохраняется - она берется из TopologyCache"""
+
+    # увеличивается при изменении состава или смысла массивов
+    version = 5
+    array_names = (
+        "seed",
+        "object_values",
+        "object_timers",
+        "object_tiles",
+        "object_tile_offsets",
+        "creature_vectors",
+        "creature_heard_distances",
+        "creature_heard_tiles",
+        "creature_bases",
+        "creature_counters"
+    )
+
+    def __init__(self, header: np.ndarray, arrays: dict[str, np.ndarray]) -> None:
+        super().__init__()
+        # версия, радиус мира, радиус региона, население, количество баз, возраст мира
+        self.header = header
+        self.arrays = arrays
+
+    @classmethod
+    def capture(cls, world: "World") -> "Checkpoint":
+        # объекты могут быть представлениями столбцов CreatureEngine или состояния шардов
+        world.sync()
+        header = np.array(
+            [cls.version, world.world_radius, world.region_radius, world.population, world.bases_number, world.age],
+            dtype = np.int64
+        )
+        objects = [*world.bases, *world.creatures]
+        base_numbers = {x.id: number for number, x in enumerate(world.bases)}
+        states = [x.get_state() for x in objects]
+        state_length = WorldObject.state_length
+        creature_states = [x[state_length:] for x in states[len(world.bases):]]
+        # состояние мира до state_length у баз и существ общее, в том числе счетчики потоков случайных чисел
+        centers, tiles, directions, last_acting_times, ages, resources, timers, random_counters = (
+            zip(*(x[:state_length] for x in states)) if states else ((),) * state_length
+        )
+
+        arrays = {
+            "seed": np.frombuffer(json.dumps(world.seed).encode(), dtype = np.uint8),
+            "object_values": np.array(
+                [centers, directions, last_acting_times, ages, resources, random_counters],
+                dtype = np.int64
+            ).reshape(6, len(objects)).T,
+            "object_timers": np.array(timers, dtype = np.float64),
+            "object_tiles": np.array([x for object_tiles in tiles for x in object_tiles], dtype = np.int64),
+            "object_tile_offsets": np.cumsum([0, *(len(x) for x in tiles)], dtype = np.int64),
+            "creature_vectors": np.array(
+                [x[:3] for x in creature_states],
+                dtype = np.int64
+            ).reshape(len(creature_states), 3, 2),
+            "creature_heard_distances": np.array(
+                [math.nan if x[3] is None else x[3] for x in creature_states],
+                dtype = np.float64
+            ),
+            "creature_heard_tiles": np.array(
+                [-1 if x[4] is None else x[4] for x in creature_states],
+                dtype = np.int64
+            ),
+            "creature_bases": np.array(
+                [(base_numbers[x[5]], base_numbers[x[6]]) for x in creature_states],
+                dtype = np.int64
+            ).reshape(len(creature_states), 2),
+            "creature_counters": np.array(
+                [x[7] for x in creature_states],
+                dtype = np.int64
+            ).reshape(len(creature_states), len(world.bases))
+        }
+        return cls(header, arrays)
+
+    def restore(self) -> "World":
+        from simulator.world import World
+
+        _, world_radius, region_radius, population, bases_number, age = self.header.tolist()
+        arrays = self.arrays
+        seed = json.loads(arrays["seed"].tobytes())
+        # геометрия загружается из TopologyCache, размещение объектов из start не повторяется
+        world = World(world_radius, region_radius, population, bases_number, seed)
+        world.age = age
+
+        values = arrays["object_values"].tolist()
+        # при целом времени тиков таймеры остаются целыми
+        timers = [int(x) if x.is_integer() else x for x in arrays["object_timers"].tolist()]
+        tile_offsets = arrays["object_tile_offsets"].tolist()
+        object_tiles = arrays["object_tiles"].tolist()
+        creature_states = zip(
+            arrays["creature_vectors"].tolist(),
+            arrays["creature_heard_distances"].tolist(),
+            arrays["creature_heard_tiles"].tolist(),
+            arrays["creature_bases"].tolist(),
+            arrays["creature_counters"].tolist()
+        )
+        for number, object_values in enumerate(values):
+            state = (
+                object_values[0],
+                object_tiles[tile_offsets[number]:tile_offsets[number + 1]],
+                *object_values[1:5],
+                timers[number],
+                object_values[5]
+            )
+            # базы восстанавливаются раньше существ
+            if number >= bases_number:
+                vectors, heard_distance, heard_tile, (start_base, finish_base), counters = next(creature_states)
+                state += (
+                    *vectors,
+                    None if math.isnan(heard_distance) else int(heard_distance),
+                    None if heard_tile < 0 else heard_tile,
+                    world.bases[start_base].id,
+                    world.bases[finish_base].id,
+                    counters
+                )
+            world.restore_object(number, state)
+
+        world.start_simulation()
+        return world
+
+    def save(self, path: str | Path) -> None:
+        """Файл - последовательность записей в формате .npy, как у TopologyCache"""
+
+        write_records(Path(path), (self.header, *(self.arrays[name] for name in self.array_names)))
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Checkpoint":
+        records = read_records(Path(path), len(cls.array_names) + 1)
+        try:
+            header = next(records)
+            if header[0] != cls.version:
+                raise ValueError(f"Checkpoint version {header[0]} is not supported, expected {cls.version}")
+            arrays = dict(zip(cls.array_names, records))
+        finally:
+            records.close()
+        return cls(header, arrays)
+
+
+class CheckpointWriter(Object):
+    """Записывает снимки в фоновом потоке, тик ждет только снятия снимка"""
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__()
+        self.path = Path(path)
+        # не больше одного ожидающего снимка - если запись не успевает, новые снимки пропускаются
+        self.checkpoints = queue.Queue[Checkpoint | None](1)
+        self.thread = threading.Thread(target = self.run, name = "checkpoint_writer", daemon = True)
+        self.thread.start()
+
+    def run(self) -> None:
+        while (checkpoint := self.checkpoints.get()) is not None:
+            try:
+                checkpoint.save(self.path)
+            except OSError as error:
+                self.logger.error(f"Checkpoint was not saved to {self.path}: {error}")
+
+    def submit(self, checkpoint: Checkpoint) -> None:
+        try:
+            self.checkpoints.put_nowait(checkpoint)
+        except queue.Full:
+            self.logger.warning(f"Checkpoint of age {checkpoint.header[-1]} is skipped: previous one is being saved")
+
+    def stop(self) -> None:
+        self.checkpoints.put(None)
+        self.thread.join()
@@ -0,0 +1,132 @@
+from array import array
+from typing import Iterator, Sequence
+
+import numpy as np
+
+from core.service.object import Object
+
+
+UINT64_MASK = (1 << 64) - 1
+# приращение состояния SplitMix64
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+
+class RandomSource(Object):
+    """Нужная симуляции часть random.Random поверх равномерных чисел из [0, 1)"""
+
+    def random(self) -> float:
+        raise NotImplementedError()
+
+    def randint(self, a: int, b: int) -> int:
+        """Целое из [a, b], как random.randint"""
+
+        return a + int(self.random() * (b - a + 1))
+
+    def randrange(self, stop: int) -> int:
+        return int(self.random() * stop)
+
+    def choice[T](self, population: Sequence[T]) -> T:
+        return population[int(self.random() * len(population))]
+
+    def sample[T](self, population: Sequence[T], k: int) -> list[T]:
+        """k разных элементов, как random.sample"""
+
+        population = list(population)
+        for number in range(k):
+            other = number + int(self.random() * (len(population) - number))
+            population[number], population[other] = population[other], population[number]
+        return population[:k]
+
+    def weighted_index(self, weights: Sequence[float]) -> int:
+        """Номер с вероятностью, пропорциональной весу, как у random.choices - первый номер, накопленный вес
+        которого больше случайной точки"""
+
+        point = self.random() * sum(weights)
+        accumulated = 0
+        for index, weight in enumerate(weights):
+            accumulated += weight
+            if point < accumulated:
+                return index
+        # из-за округления точка может совпасть с суммой весов
+        return len(weights) - 1
+
+    def weighted_choice[T](self, population: Sequence[T], weights: Sequence[float]) -> T:
+        return population[self.weighted_index(weights)]
+
+
+class CounterRandom(RandomSource):
+    """Поток SplitMix64 с явным счетчиком: n-е число - хэш ключа и n
+
+    Числа потока не зависят от других потоков и от порядка обращений к ним, а состояние - одно целое,
+    поэтому потоки объектов переносятся между процессами и снимками вместе с состоянием объектов,
+    а CreatureEngine получает те же числа векторно через random_array.
+    Числа создаются NumPy блоками по RANDOM_BLOCK_SIZE, поэтому одиночное число дешевле вызова random.Random.
+    """
+
+    # размер блока -> приращения состояния для номеров 1, 2, ..., размер блока
+    block_steps: dict[int, np.ndarray] = {}
+
+    def __init__(self, key: int, counter: int = 0) -> None:
+        super().__init__()
+        self.key = key
+        # номер последнего выданного числа, задается снаружи только через seek
+        self.counter = counter
+        self.block_size = self.settings.RANDOM_BLOCK_SIZE
+        # пары (номер, число) оставшейся части блока, блок создается при первом обращении
+        self.values: Iterator[tuple[int, float]] = iter(())
+
+    @staticmethod
+    def mix(value: int) -> int:
+        value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & UINT64_MASK
+        value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & UINT64_MASK
+        return value ^ (value >> 31)
+
+    @classmethod
+    def get_stream_key(cls, key: int, stream: int) -> int:
+        """Ключ потока номер stream, порожденного от потока с ключом key"""
+
+        return cls.mix((key + (stream + 1) * GOLDEN_GAMMA) & UINT64_MASK)
+
+    def refill(self) -> None:
+        """Создает блок чисел, начиная со следующего за выданными"""
+
+        steps = self.block_steps.get(self.block_size)
+        if steps is None:
+            steps = np.arange(1, self.block_size + 1, dtype = np.uint64) * np.uint64(GOLDEN_GAMMA)
+            self.block_steps[self.block_size] = steps
+        states = steps + np.uint64((self.key + self.counter * GOLDEN_GAMMA) & UINT64_MASK)
+        # array - числа занимают меньше, чем в списке, и берутся быстрее, чем из numpy-массива
+        self.values = enumerate(array("d", self.mix_array(states).tobytes()), self.counter + 1)
+
+    def seek(self, counter: int) -> None:
+        """Следующим будет выдано число с номером counter + 1"""
+
+        if counter != self.counter:
+            self.counter = counter
+            self.values = iter(())
+
+    def random(self) -> float:
+        try:
+            self.counter, value = next(self.values)
+        except StopIteration:
+            self.refill()
+            self.counter, value = next(self.values)
+        return value
+
+    @staticmethod
+    def mix_array(values: np.ndarray) -> np.ndarray:
+        """Числа из [0, 1) по состояниям values, values меняется, uint64 переполняется так же, как маска в mix"""
+
+        values ^= values >> np.uint64(30)
+        values *= np.uint64(0xBF58476D1CE4E5B9)
+        values ^= values >> np.uint64(27)
+        values *= np.uint64(0x94D049BB133111EB)
+        values ^= values >> np.uint64(31)
+        values >>= np.uint64(11)
+        return values * 2.0 ** -53
+
+    @classmethod
+    def random_array(cls, keys: np.ndarray, counters: np.ndarray) -> np.ndarray:
+        """Числа потоков с ключами keys под номерами counters"""
+
+        return cls.mix_array(keys.astype(np.uint64) + counters.astype(np.uint64) * np.uint64(GOLDEN_GAMMA))
@@ -1,43 +1,43 @@
-import random
-from typing import Any, Sequence, TYPE_CHECKING, Union
+from typing import Sequence, TYPE_CHECKING, Union
 
-from arcade import color
-
-from core.service.coordinates import Coordinates
+from core.service.coordinates import Vector
 from simulator.tile import Tile
-from simulator.world_object import WorldObject, WorldObjectProjection
+from simulator.world_object import WorldObject
 
 
 if TYPE_CHECKING:
     from simulator.base import Base
+    from simulator.lattice import LatticeIndex
+    from simulator.world_object import State
     from simulator.world import BaseSet, Regions2
 
 
-class CreatureProjection(WorldObjectProjection):
-    main_color = color.APRICOT
-
-
 class Creature(WorldObject):
-    projection_class = CreatureProjection
-    projections: dict["Tile", projection_class]
     is_creature = True
-
-    def __init__(self, center_tile: "Tile", time: int, bases: Sequence["Base"]) -> None:
-        super().__init__(center_tile, time)
-        if len(bases) > 1:
-            self.start_base, self.finish_base = random.sample(bases, 2)
-        else:
-            self.start_base = bases[0]
-            self.finish_base = bases[0]
-        self.scream_radius = 10
-        self.hear_radius = 100
+    # общие для всех существ, от них зависит, какие регионы затрагивает обработка региона
+    scream_radius = 10
+    hear_radius = 100
+
+    def __init__(
+            self,
+            center_tile: "Tile",
+            time: int,
+            world_random_key: int,
+            bases: Sequence["Base"],
+            object_id: int,
+            action_id: int
+    ) -> None:
+        super().__init__(center_tile, time, world_random_key, object_id, action_id)
+        # задаются в randomize или set_state
+        self.start_base = bases[0]
+        self.finish_base = bases[0]
 
         # эталон направления движения
-        self.reference_direction_vector = Coordinates(random.randint(-10, 10), random.randint(-10, 10))
+        self.reference_direction_vector = Vector()
         # направление движения
-        self.direction_vector = Coordinates(0, 0)
+        self.direction_vector = Vector()
         # пройденный путь
-        self.path_vector: Coordinates = Coordinates(0, 0)
+        self.path_vector = Vector()
         self.bases_reach_counter = {base: 0 for base in bases}
         self.heard_distance: int | None = None
         self.heard_tile: Union["Tile", None] = None
@@ -50,6 +50,41 @@ class Creature(WorldObject):
 
         self.change_direction_period = 1
 
+    def randomize(self) -> None:
+        super().randomize()
+        bases = list(self.bases_reach_counter)
+        if len(bases) > 1:
+            self.start_base, self.finish_base = self.random_generator.sample(bases, 2)
+        self.reference_direction_vector.set(
+            self.random_generator.randint(-10, 10),
+            self.random_generator.randint(-10, 10)
+        )
+
+    def get_state(self) -> "State":
+        return super().get_state() + (
+            self.reference_direction_vector.to_2,
+            self.direction_vector.to_2,
+            self.path_vector.to_2,
+            self.heard_distance,
+            None if self.heard_tile is None else self.heard_tile.index,
+            self.start_base.id,
+            self.finish_base.id,
+            tuple(self.bases_reach_counter.values())
+        )
+
+    def set_state(self, state: "State", tiles: "LatticeIndex[Tile]", bases_by_id: dict[int, "Base"]) -> None:
+        super().set_state(state[:self.state_length], tiles, bases_by_id)
+        (reference_direction, direction, path, self.heard_distance, heard_tile_index, start_base_id, finish_base_id,
+         counters) = state[self.state_length:]
+
+        self.reference_direction_vector.set(*reference_direction)
+        self.direction_vector.set(*direction)
+        self.path_vector.set(*path)
+        self.heard_tile = None if heard_tile_index is None else tiles[heard_tile_index]
+        self.start_base = bases_by_id[start_base_id]
+        self.finish_base = bases_by_id[finish_base_id]
+        self.bases_reach_counter = dict(zip(self.bases_reach_counter, counters))
+
     def calculate_direction(self) -> None:
         a = self.direction_vector.a - self.path_vector.a
         b = self.direction_vector.b - self.path_vector.b
@@ -59,7 +94,7 @@ class Creature(WorldObject):
         abs_a = abs(a) + offset
         abs_b = abs(b) + offset
         abs_c = abs(c) + offset
-        farthest = random.choices((a, b, c), (abs_a, abs_b, abs_c))[0]
+        farthest = self.random_generator.weighted_choice((a, b, c), (abs_a, abs_b, abs_c))
         if farthest == a:
             if a >= 0:
                 self.direction = 0
@@ -76,8 +111,8 @@ class Creature(WorldObject):
             else:
                 self.direction = 5
 
-        if random.randint(0, 99) > 95:
-            self.direction = (self.direction + random.choice((-1, 1))) % 6
+        if self.random_generator.randint(0, 99) > 95:
+            self.direction = (self.direction + self.random_generator.choice((-1, 1))) % 6
 
     def reflect_direction(self) -> None:
         if self.center_tile.neighbours[(self.direction + 1) % 6].object is None:
@@ -89,8 +124,11 @@ class Creature(WorldObject):
 
     def calculate_vector(self) -> None:
         if self.heard_distance is not None:
-            self.reference_direction_vector = self.heard_tile.coordinates - self.center_tile.coordinates
-            self.direction_vector = self.reference_direction_vector.copy()
+            self.reference_direction_vector.set(
+                self.heard_tile.x - self.center_tile.x,
+                self.heard_tile.y - self.center_tile.y
+            )
+            self.direction_vector.set_from(self.reference_direction_vector)
             self.path_vector.reset()
             self.heard_distance = None
             self.heard_tile = None
@@ -115,7 +153,7 @@ class Creature(WorldObject):
             self.bases_reach_counter[self.finish_base] = -delta_time
             self.start_base = self.finish_base
             while len(bases) > 1 and self.finish_base == self.start_base:
-                self.finish_base = random.choice(bases)
+                self.finish_base = self.random_generator.choice(bases)
             self.turn_around()
         # Попытка обойти
         elif blocker is not None:
@@ -143,48 +181,71 @@ class Creature(WorldObject):
             self.bases_reach_counter[blocker] = -delta_time
             self.reflect_direction()
 
-    def on_update(self, time: int, regions_2: "Regions2", bases: "BaseSet") -> Any:
+    def on_update(self, time: int, regions_2: "Regions2", bases: "BaseSet") -> list[WorldObject]:
+        """Возвращает объекты, измененные за действие"""
+
         delta_time = time - self.last_acting_time
         self.last_acting_time = time
 
-        old_coordinates = self.center_tile.coordinates
+        old_tile = self.center_tile
         if self.is_scout:
             self.act_scout(time, delta_time)
         else:
             self.act(time, delta_time, bases)
-        self.path_vector += self.center_tile.coordinates - old_coordinates
+        self.path_vector.add(self.center_tile.x - old_tile.x, self.center_tile.y - old_tile.y)
 
-        self.cry(regions_2)
+        listeners = self.cry()
         self.age += delta_time
         self.bases_reach_counter = {base: counter + delta_time for base, counter in self.bases_reach_counter.items()}
+        listeners.append(self)
+        return listeners
+
+    def cry(self) -> list["Creature"]:
+        # крики собираются регионами после обработки всех регионов тика, в Audience.propagate
+        if self.settings.SCREAM_PROPAGATION == "regions":
+            return []
+        audience = self.center_tile.region.audience
+        if self.settings.SCREAM_LISTENERS == "layers":
+            layers = self.topology.get_scream_layers(self.scream_radius)
+            rows, distances = audience.get_region_creatures(self.center_tile, layers)
+        else:
+            rows, distances = audience.get_creatures(self.center_tile, self.scream_radius)
+        # в плотных скоплениях крик обрабатывается для всех существ сразу
+        if len(rows) >= self.settings.CRY_BATCH_SIZE:
+            listeners = audience.cry(self, rows, distances)
+        else:
+            listeners = self.cry_each([audience.creatures[x] for x in rows.tolist()], distances.tolist())
+        return listeners
 
-    def cry(self, regions_2: "Regions2") -> None:
-        for other in self.center_tile.region.get_creatures(self.scream_radius, regions_2):
+    def cry_each(self, others: list["Creature"], distances: list[int]) -> list["Creature"]:
+        listeners = []
+        for other, crier_distance in zip(others, distances):
             if self.id != other.id:
-                crier_distance = self.center_tile.coordinates.distance_3(other.center_tile.coordinates, True)
                 base_distance = crier_distance + self.bases_reach_counter[other.finish_base]
                 if (crier_distance <= other.hear_radius and
                         (other.heard_distance is None or base_distance < other.heard_distance)):
                     other.heard_distance = base_distance
                     other.heard_tile = self.center_tile
+                    listeners.append(other)
+        return listeners
 
     def turn_right(self) -> None:
         self.direction = (self.direction + 1) % 6
         if self.reference_direction_vector:
-            self.reference_direction_vector = self.reference_direction_vector.rotate_60()
-            self.direction_vector = self.reference_direction_vector.copy()
+            self.reference_direction_vector.rotate_60()
+            self.direction_vector.set_from(self.reference_direction_vector)
             self.path_vector.reset()
 
     def turn_left(self) -> None:
         self.direction = (self.direction + 5) % 6
         if self.reference_direction_vector:
-            self.reference_direction_vector = self.reference_direction_vector.rotate_60(clockwise = False)
-            self.direction_vector = self.reference_direction_vector.copy()
+            self.reference_direction_vector.rotate_60(clockwise = False)
+            self.direction_vector.set_from(self.reference_direction_vector)
             self.path_vector.reset()
 
     def turn_around(self) -> None:
         self.direction = (self.direction + 3) % 6
         if self.reference_direction_vector:
             self.reference_direction_vector *= -1
-            self.direction_vector = self.reference_direction_vector.copy()
+            self.direction_vector.set_from(self.reference_direction_vector)
             self.path_vector.reset()
@@ -0,0 +1,362 @@
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from core.service.object import Object
+from simulator.counter_random import CounterRandom
+
+
+if TYPE_CHECKING:
+    from simulator.world import World
+
+
+class CreatureEngine(Object):
+    """Существа в виде столбцов NumPy: существа тика сначала все вместе двигаются, а затем все вместе кричат"""
+
+    # смещение, чтобы вес направления был > 0, как в Creature.calculate_direction
+    direction_weight_offset = 0.000001
+
+    def __init__(self, world: "World") -> None:
+        super().__init__()
+        self.world = world
+        self.creatures = world.creatures
+        self.bases = world.bases
+        self.topology = world.topology
+        geometry = world.geometry
+        self.tile_coordinates = np.asarray(geometry["tile_coordinates"], dtype = np.int64)
+        self.tile_neighbours = np.asarray(geometry["tile_neighbours"], dtype = np.int64)
+        self.tile_regions = np.asarray(geometry["tile_regions"], dtype = np.int64)
+
+        creatures = self.creatures
+        # потоки случайных чисел существ, числа совпадают с CounterRandom объектов
+        self.random_keys = np.array([x.random_generator.key for x in creatures], dtype = np.uint64)
+        self.random_counters = np.array([x.random_generator.counter for x in creatures], dtype = np.int64)
+        base_columns = {base: column for column, base in enumerate(self.bases)}
+        self.tiles = np.array([x.center_tile.index for x in creatures], dtype = np.int64)
+        self.directions = np.array([x.direction for x in creatures], dtype = np.int64)
+        # (P, 2) векторы в осевых координатах, третья кубическая координата - -x - y
+        self.reference_vectors = np.array(
+            [x.reference_direction_vector.to_2 for x in creatures],
+            dtype = np.int64
+        ).reshape(-1, 2)
+        self.direction_vectors = np.array(
+            [x.direction_vector.to_2 for x in creatures],
+            dtype = np.int64
+        ).reshape(-1, 2)
+        self.path_vectors = np.array([x.path_vector.to_2 for x in creatures], dtype = np.int64).reshape(-1, 2)
+        self.scouts = np.array([x.is_scout for x in creatures], dtype = np.bool_)
+        self.start_bases = np.array([base_columns[x.start_base] for x in creatures], dtype = np.int64)
+        self.finish_bases = np.array([base_columns[x.finish_base] for x in creatures], dtype = np.int64)
+        # inf - существо ничего не слышало
+        self.heard_distances = np.array(
+            [math.inf if x.heard_distance is None else x.heard_distance for x in creatures],
+            dtype = np.float64
+        )
+        self.heard_tiles = np.array(
+            [-1 if x.heard_tile is None else x.heard_tile.index for x in creatures],
+            dtype = np.int64
+        )
+        self.counters = np.array(
+            [list(x.bases_reach_counter.values()) for x in creatures],
+            dtype = np.int64
+        ).reshape(len(creatures), len(self.bases))
+        self.ages = np.array([x.age for x in creatures], dtype = np.int64)
+        self.last_acting_times = np.array([x.last_acting_time for x in creatures], dtype = np.int64)
+        self.act_periods = np.array([x.act_period for x in creatures], dtype = np.int64)
+        self.act_remainders = np.array([x.act_remainder for x in creatures], dtype = np.int64)
+        self.change_direction_periods = np.array([x.change_direction_period for x in creatures], dtype = np.int64)
+        self.hear_radiuses = np.array([x.hear_radius for x in creatures], dtype = np.int64)
+        self.scream_radiuses = np.array([x.scream_radius for x in creatures], dtype = np.int64)
+
+        # занятость тайлов: -1 - свободен, номер базы или len(bases) + номер существа
+        self.occupants = np.full(len(self.tile_coordinates), -1, dtype = np.int64)
+        for column, base in enumerate(self.bases):
+            self.occupants[[x.index for x in base.tiles]] = column
+        self.occupants[self.tiles] = len(self.bases) + np.arange(len(creatures))
+
+        # ключ класса вычетов -> номер тайла, для поиска слушателей по смещениям от кричащего
+        self.key_tiles = world.tiles.indexes_array
+        # смещения для поиска слушателей берутся по наибольшему радиусу, затем отсекаются по радиусу кричащего
+        self.scream_radius = int(self.scream_radiuses.max(initial = 0))
+        # (R, K) регионы, существ которых слышно из региона при SCREAM_LISTENERS == "layers", повторы заменены на -1
+        self.cry_regions: np.ndarray | None = None
+        if self.settings.SCREAM_LISTENERS == "layers":
+            self.cry_regions = self.topology.get_layer_table(
+                world.regions.coordinates_array,
+                world.regions.indexes_array,
+                self.topology.get_scream_layers(self.scream_radius)
+            )
+
+    def on_update(self, time: int) -> None:
+        due = np.flatnonzero(time % self.act_periods == self.act_remainders)
+        if len(due) == 0:
+            return
+        delta_time = time - self.last_acting_times[due]
+        self.last_acting_times[due] = time
+        old_tiles = self.tiles[due]
+
+        turning = due[time % self.change_direction_periods[due] == 0]
+        self.calculate_vectors(turning)
+        self.calculate_directions(turning)
+        blockers = self.move(due, self.directions[due])
+        scouts = self.scouts[due]
+
+        # достигли финальной базы
+        reached = ~scouts & (blockers == self.finish_bases[due])
+        rows = due[reached]
+        self.counters[rows, self.finish_bases[rows]] = -delta_time[reached]
+        self.start_bases[rows] = self.finish_bases[rows]
+        if len(self.bases) > 1:
+            # как в Creature.act - выбор повторяется, пока не выпадет другая база
+            pending = rows
+            while len(pending) > 0:
+                self.finish_bases[pending] = (self.random(pending) * len(self.bases)).astype(np.int64)
+                pending = pending[self.finish_bases[pending] == self.start_bases[pending]]
+        self.turn(rows, 3)
+
+        # попытка обойти
+        rows = due[~scouts & ~reached & (blockers >= 0)]
+        directions = self.get_free_directions(rows)
+        movable = directions >= 0
+        self.move(rows[movable], directions[movable])
+
+        # скауты достигли любой базы
+        reached = scouts & (blockers >= 0) & (blockers < len(self.bases))
+        rows = due[reached]
+        self.counters[rows, blockers[reached]] = -delta_time[reached]
+        directions = self.get_free_directions(rows)
+        turns = np.where(directions >= 0, (directions - self.directions[rows]) % 6, 0)
+        for turn in (1, 5, 3):
+            self.turn(rows[turns == turn], turn)
+
+        self.path_vectors[due] += self.tile_coordinates[self.tiles[due]] - self.tile_coordinates[old_tiles]
+        if self.world.region_screams is None:
+            self.cry(due)
+        self.ages[due] += delta_time
+        self.counters[due] += delta_time[:, np.newaxis]
+        if self.world.region_screams is not None:
+            self.propagate(due)
+
+    def calculate_vectors(self, rows: np.ndarray) -> None:
+        """Creature.calculate_vector и Creature.calculate_vector_scout"""
+
+        heard = rows[~self.scouts[rows] & np.isfinite(self.heard_distances[rows])]
+        self.reference_vectors[heard] = (
+                self.tile_coordinates[self.heard_tiles[heard]] - self.tile_coordinates[self.tiles[heard]]
+        )
+        self.direction_vectors[heard] = self.reference_vectors[heard]
+        self.path_vectors[heard] = 0
+        self.heard_distances[heard] = math.inf
+        self.heard_tiles[heard] = -1
+
+        paths = self.path_vectors[rows]
+        directions = self.direction_vectors[rows]
+        passed = ((np.abs(paths) >= np.abs(directions)).any(axis = 1)
+                  | (np.abs(paths.sum(axis = 1)) >= np.abs(directions.sum(axis = 1))))
+        self.direction_vectors[rows[passed]] += self.reference_vectors[rows[passed]]
+
+    def calculate_directions(self, rows: np.ndarray) -> None:
+        """Creature.calculate_direction: направление к самой отстающей координате с вероятностью, равной ее весу"""
+
+        difference = self.direction_vectors[rows] - self.path_vectors[rows]
+        values = np.column_stack((difference, -difference.sum(axis = 1)))
+        weights = np.abs(values) + self.direction_weight_offset
+        # как RandomSource.weighted_index: первый номер, накопленный вес которого больше случайной точки
+        points = self.random(rows) * weights.sum(axis = 1)
+        chosen = np.minimum((np.cumsum(weights, axis = 1) <= points[:, np.newaxis]).sum(axis = 1), 2)
+        farthest = values[np.arange(len(rows)), chosen]
+        # выбранная координата определяется по значению, как в Creature.calculate_direction
+        a, b, c = values.T
+        directions = np.where(
+            farthest == a,
+            np.where(a >= 0, 0, 3),
+            np.where(farthest == b, np.where(b >= 0, 4, 1), np.where(c >= 0, 2, 5))
+        )
+
+        # randint(0, 99) > 95 и choice((-1, 1)), третье число берется только у отклонившихся
+        deviation = (self.random(rows) * 100).astype(np.int64) > 95
+        directions[deviation] += np.where(self.random(rows[deviation]) < 0.5, -1, 1)
+        self.directions[rows] = directions % 6
+
+    def random(self, rows: np.ndarray) -> np.ndarray:
+        """Следующие числа потоков существ rows, номера существ не повторяются"""
+
+        self.random_counters[rows] += 1
+        return CounterRandom.random_array(self.random_keys[rows], self.random_counters[rows])
+
+    def move(self, rows: np.ndarray, directions: np.ndarray) -> np.ndarray:
+        """Перемещает существа на соседние тайлы, возвращает занявших нужный тайл или -1
+
+        Из претендентов на один свободный тайл его занимает первый по номеру, освобожденные за раунд тайлы
+        доступны в следующем раунде, поэтому цепочки существ сдвигаются, как при обработке по очереди.
+        """
+
+        targets = self.tile_neighbours[self.tiles[rows], directions]
+        pending = np.arange(len(rows))
+        moved = np.zeros(len(rows), dtype = np.bool_)
+        while len(pending) > 0:
+            candidates = pending[self.occupants[targets[pending]] < 0]
+            if len(candidates) == 0:
+                break
+            _, first = np.unique(targets[candidates], return_index = True)
+            winners = candidates[first]
+            winner_rows = rows[winners]
+            self.occupants[self.tiles[winner_rows]] = -1
+            self.occupants[targets[winners]] = len(self.bases) + winner_rows
+            self.tiles[winner_rows] = targets[winners]
+            moved[winners] = True
+            pending = pending[~moved[pending]]
+
+        blockers = np.full(len(rows), -1, dtype = np.int64)
+        blockers[pending] = self.occupants[targets[pending]]
+        return blockers
+
+    def get_free_directions(self, rows: np.ndarray) -> np.ndarray:
+        """Первое свободное направление из повернутых направо, налево и назад или -1"""
+
+        free_directions = np.full(len(rows), -1, dtype = np.int64)
+        for turn in (3, 5, 1):
+            directions = (self.directions[rows] + turn) % 6
+            free = self.occupants[self.tile_neighbours[self.tiles[rows], directions]] < 0
+            free_directions[free] = directions[free]
+        return free_directions
+
+    def turn(self, rows: np.ndarray, turn: int) -> None:
+        """Creature.turn_right (1), turn_left (5) и turn_around (3)"""
+
+        self.directions[rows] = (self.directions[rows] + turn) % 6
+        x, y = self.reference_vectors[rows].T
+        if turn == 1:
+            self.reference_vectors[rows] = np.column_stack((-y, x + y))
+        elif turn == 5:
+            self.reference_vectors[rows] = np.column_stack((x + y, -x))
+        else:
+            self.reference_vectors[rows] = -self.reference_vectors[rows]
+        self.direction_vectors[rows] = self.reference_vectors[rows]
+        self.path_vectors[rows] = 0
+
+    def cry(self, criers: np.ndarray) -> None:
+        """Все крики тика: слушатель запоминает самый короткий путь до базы, при равенстве - от первого кричащего"""
+
+        if self.cry_regions is not None:
+            crier_rows, listeners, distances = self.get_region_pairs(criers)
+        else:
+            crier_rows, listeners, distances = self.get_range_pairs(criers)
+        base_distances = distances + self.counters.ravel()[
+            crier_rows * len(self.bases) + self.finish_bases[listeners]
+        ]
+        heard = ((listeners != crier_rows) & (distances <= self.hear_radiuses[listeners])
+                 & (base_distances < self.heard_distances[listeners]))
+        listeners = listeners[heard]
+        crier_rows = crier_rows[heard]
+        base_distances = base_distances[heard]
+
+        # у каждого слушателя побеждает пара с наименьшим расстоянием, при равенстве - с первым кричащим,
+        # кричащие упорядочены по номерам
+        pairs = np.lexsort((crier_rows, base_distances, listeners))
+        _, first = np.unique(listeners[pairs], return_index = True)
+        pairs = pairs[first]
+        self.heard_distances[listeners[pairs]] = base_distances[pairs]
+        self.heard_tiles[listeners[pairs]] = self.tiles[crier_rows[pairs]]
+
+    def get_range_pairs(self, criers: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Пары кричащий - слушатель по занятости тайлов в пределах радиуса крика и расстояния между ними"""
+
+        offsets, offset_distances = self.topology.get_range(self.scream_radius)
+        # int32 - деление при вычислении ключей быстрее
+        x, y = self.tile_coordinates[self.tiles[criers]].T.astype(np.int32)
+        keys = self.topology.get_cycle_keys(
+            x[:, np.newaxis] + offsets[:, 0].astype(np.int32),
+            y[:, np.newaxis] + offsets[:, 1].astype(np.int32)
+        )
+        occupants = self.occupants[self.key_tiles[keys]] - len(self.bases)
+        crier_numbers, offset_numbers = np.nonzero(occupants >= 0)
+        listeners = occupants[crier_numbers, offset_numbers]
+        crier_rows = criers[crier_numbers]
+        distances = offset_distances[offset_numbers]
+        in_radius = distances <= self.scream_radiuses[crier_rows]
+        return crier_rows[in_radius], listeners[in_radius], distances[in_radius]
+
+    def get_region_pairs(self, criers: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Пары кричащий - слушатель из регионов, слышимых из региона кричащего, и расстояния между ними"""
+
+        # существа, сгруппированные по регионам
+        regions = self.tile_regions[self.tiles]
+        order = np.argsort(regions, kind = "stable").astype(np.int32)
+        # последний элемент - для отсутствующего региона -1
+        counts = np.zeros(len(self.cry_regions) + 1, dtype = np.int64)
+        counts[:-1] = np.bincount(regions, minlength = len(self.cry_regions))
+        starts = np.cumsum(counts) - counts
+
+        cry_regions = self.cry_regions[regions[criers]]
+        segment_counts = counts[cry_regions].ravel()
+        segment_shifts = starts[cry_regions].ravel() - (np.cumsum(segment_counts) - segment_counts)
+        pair_numbers = np.repeat(segment_shifts, segment_counts) + np.arange(segment_counts.sum())
+        listeners = order[pair_numbers]
+        crier_pairs = counts[cry_regions].sum(axis = 1)
+        crier_rows = np.repeat(criers, crier_pairs)
+
+        # int32 - деление при вычислении ключей быстрее
+        x, y = self.tile_coordinates[self.tiles].T.astype(np.int32)
+        keys = self.topology.get_cycle_keys(x[listeners] - x[crier_rows], y[listeners] - y[crier_rows])
+        return crier_rows, listeners, self.topology.distance_3_array[keys]
+
+    def propagate(self, criers: np.ndarray) -> None:
+        """Крики тика через регионы, как Audience.propagate"""
+
+        x, y = self.tile_coordinates[self.tiles].T
+        listeners, base_distances, sources = self.world.region_screams.propagate(
+            criers,
+            self.counters[criers],
+            np.arange(len(self.creatures)),
+            x,
+            y,
+            self.finish_bases,
+            self.hear_radiuses,
+            self.heard_distances
+        )
+        self.heard_distances[listeners] = base_distances
+        self.heard_tiles[listeners] = self.tiles[sources]
+
+    def sync(self) -> None:
+        """Переносит столбцы в объекты Creature"""
+
+        tiles = self.world.tiles
+        bases = self.bases
+        columns = zip(
+            self.tiles.tolist(),
+            self.directions.tolist(),
+            self.reference_vectors.tolist(),
+            self.direction_vectors.tolist(),
+            self.path_vectors.tolist(),
+            self.start_bases.tolist(),
+            self.finish_bases.tolist(),
+            self.heard_distances.tolist(),
+            self.heard_tiles.tolist(),
+            self.counters.tolist(),
+            self.ages.tolist(),
+            self.last_acting_times.tolist(),
+            self.random_counters.tolist()
+        )
+        for creature, (tile_index, direction, reference_vector, direction_vector, path_vector, start_base,
+                       finish_base, heard_distance, heard_tile, counters, age, last_acting_time,
+                       random_counter) in zip(
+            self.creatures,
+            columns
+        ):
+            if creature.center_tile.index != tile_index:
+                center_tile = tiles[tile_index]
+                creature.relocate(center_tile, [center_tile])
+            creature.direction = direction
+            creature.reference_direction_vector.set(*reference_vector)
+            creature.direction_vector.set(*direction_vector)
+            creature.path_vector.set(*path_vector)
+            creature.start_base = bases[start_base]
+            creature.finish_base = bases[finish_base]
+            creature.heard_distance = None if math.isinf(heard_distance) else int(heard_distance)
+            creature.heard_tile = None if heard_tile < 0 else tiles[heard_tile]
+            creature.bases_reach_counter = dict(zip(bases, counters))
+            creature.age = age
+            creature.last_acting_time = last_acting_time
+            creature.random_generator.seek(random_counter)
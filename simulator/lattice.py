@@ -0,0 +1,173 @@
+from array import array
+from typing import Any, Callable, Iterator, Protocol, TYPE_CHECKING
+
+import numpy as np
+
+
+if TYPE_CHECKING:
+    from core.service.topology import Topology
+
+
+class LatticeObject(Protocol):
+    x: int
+    y: int
+    index: int
+
+
+class LatticeIndex[T: LatticeObject]:
+    """Плотный индекс объектов решетки: координаты <-> номер объекта <-> объект"""
+
+    def __init__(self, topology: "Topology") -> None:
+        self.topology = topology
+        self.objects: list[T] = []
+        # номер объекта по ключу класса вычетов его координат, -1 - объекта нет
+        self.indexes = array("i", [-1]) * topology.size
+        self.view_2 = LatticeView2(self)
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.objects)
+
+    def __getitem__(self, index: int) -> T:
+        return self.objects[index]
+
+    @property
+    def coordinates_array(self) -> np.ndarray:
+        """(N, 2) координаты объектов в порядке номеров"""
+
+        return np.array([(x.x, x.y) for x in self.objects], dtype = np.int64).reshape(-1, 2)
+
+    @property
+    def indexes_array(self) -> np.ndarray:
+        # без копирования
+        return np.frombuffer(self.indexes, dtype = np.int32)
+
+    def add(self, lattice_object: T) -> int:
+        key = self.topology.get_cycle_key(lattice_object.x, lattice_object.y)
+        assert self.indexes[key] == -1, f"{lattice_object} and {self.objects[self.indexes[key]]} are the same place"
+
+        lattice_object.index = len(self.objects)
+        self.indexes[key] = lattice_object.index
+        self.objects.append(lattice_object)
+        return lattice_object.index
+
+    def get_index(self, x: int, y: int) -> int:
+        """Номер объекта с точно такими координатами или -1"""
+
+        index = self.indexes[self.topology.get_cycle_key(x, y)]
+        if index >= 0:
+            lattice_object = self.objects[index]
+            if lattice_object.x != x or lattice_object.y != y:
+                index = -1
+        return index
+
+    def get(self, x: int, y: int) -> T | None:
+        index = self.get_index(x, y)
+        if index >= 0:
+            lattice_object = self.objects[index]
+        else:
+            lattice_object = None
+        return lattice_object
+
+
+class LazyLatticeIndex[T: LatticeObject](LatticeIndex[T]):
+    """Индекс, номера и координаты которого заданы геометрией, а объекты создаются при первом обращении"""
+
+    def __init__(
+            self,
+            topology: "Topology",
+            coordinates: np.ndarray,
+            neighbours: np.ndarray,
+            materialize: Callable[[int], T]
+    ) -> None:
+        super().__init__(topology)
+        # (N, 2) координаты и (N, 6) номера соседей всех объектов, в том числе несозданных
+        self.coordinates = coordinates
+        self.neighbours = neighbours
+        # создает объект с данным номером и добавляет его через add
+        self.materialize = materialize
+        self.objects: list[T | None] = [None] * len(coordinates)
+        self.indexes_array[topology.get_cycle_keys(coordinates[:, 0], coordinates[:, 1])] = np.arange(
+            len(coordinates),
+            dtype = np.int32
+        )
+
+    def __iter__(self) -> Iterator[T]:
+        for index in range(len(self.objects)):
+            yield self[index]
+
+    def __getitem__(self, index: int) -> T:
+        lattice_object = self.objects[index]
+        if lattice_object is None:
+            lattice_object = self.materialize(index)
+        return lattice_object
+
+    @property
+    def coordinates_array(self) -> np.ndarray:
+        return self.coordinates
+
+    def add(self, lattice_object: T) -> int:
+        """Номер объекта задан геометрией"""
+
+        lattice_object.index = self.indexes[self.topology.get_cycle_key(lattice_object.x, lattice_object.y)]
+        assert self.objects[lattice_object.index] is None, f"{lattice_object} is already created"
+        lattice_object.lattice = self
+        self.objects[lattice_object.index] = lattice_object
+        return lattice_object.index
+
+    def get_index(self, x: int, y: int) -> int:
+        index = self.indexes[self.topology.get_cycle_key(x, y)]
+        if index >= 0 and self.coordinates[index].tolist() != [x, y]:
+            index = -1
+        return index
+
+    def get(self, x: int, y: int) -> T | None:
+        index = self.get_index(x, y)
+        return self[index] if index >= 0 else None
+
+    def get_neighbours(self, index: int) -> list[T]:
+        return [self[x] for x in self.neighbours[index].tolist()]
+
+
+class LazyNeighbours:
+    """Соседи объекта из LazyLatticeIndex связываются при первом обращении, а не при создании объекта"""
+
+    neighbours: list
+
+    def __getattr__(self, name: str) -> Any:
+        # вызывается, только если атрибута нет
+        if name == "neighbours" and "lattice" in self.__dict__:
+            self.init(self.lattice.get_neighbours(self.index))
+            return self.neighbours
+        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+
+
+class LatticeView2[T: LatticeObject]:
+    """Доступ к объектам в виде view[x][y], как к словарю словарей"""
+
+    __slots__ = ["lattice_index"]
+
+    def __init__(self, lattice_index: LatticeIndex[T]) -> None:
+        self.lattice_index = lattice_index
+
+    def __getitem__(self, x: int) -> "LatticeRow[T]":
+        return LatticeRow(self.lattice_index, x)
+
+
+class LatticeRow[T: LatticeObject]:
+    __slots__ = ["lattice_index", "x"]
+
+    def __init__(self, lattice_index: LatticeIndex[T], x: int) -> None:
+        self.lattice_index = lattice_index
+        self.x = x
+
+    def __getitem__(self, y: int) -> T:
+        lattice_object = self.lattice_index.get(self.x, y)
+        if lattice_object is None:
+            raise KeyError((self.x, y))
+        return lattice_object
+
+    def __contains__(self, y: int) -> bool:
+        return self.lattice_index.get_index(self.x, y) >= 0
@@ -0,0 +1,70 @@
+from array import array
+
+import numpy as np
+
+
+class FreeTiles:
+    """Свободные тайлы в фиксированном порядке: выбор number-го свободного и удаление за O(log N) (дерево Фенвика)"""
+
+    def __init__(self, order: np.ndarray) -> None:
+        # номера тайлов в порядке выбора
+        self.order = array("q", order.astype(np.int64).tobytes())
+        self.positions = array("q", bytes(8 * len(order)))
+        self.positions_array = np.frombuffer(self.positions, dtype = np.int64)
+        self.positions_array[order] = np.arange(len(order))
+        self.free = np.ones(len(order), dtype = np.bool_)
+        self.size = len(order)
+
+        # tree[i] - количество свободных на отрезке (i - lowbit(i), i], нумерация с 1
+        numbers = np.arange(len(order) + 1)
+        prefix = np.zeros(len(order) + 1, dtype = np.int64)
+        np.cumsum(self.free, out = prefix[1:])
+        # array - для быстрых одиночных операций, его numpy-представление без копирования - для массовых
+        self.tree = array("q", (prefix - prefix[numbers - (numbers & -numbers)]).tobytes())
+        self.tree_array = np.frombuffer(self.tree, dtype = np.int64)
+        self.top_bit = 1 << max(len(order).bit_length() - 1, 0)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def get(self, number: int) -> int:
+        """Номер тайла, number-го по порядку среди свободных"""
+
+        position = 0
+        bit = self.top_bit
+        tree = self.tree
+        length = len(tree)
+        while bit:
+            next_position = position + bit
+            if next_position < length and tree[next_position] <= number:
+                position = next_position
+                number -= tree[next_position]
+            bit >>= 1
+        return self.order[position]
+
+    def remove(self, tile_indexes: np.ndarray) -> None:
+        positions = self.positions_array[np.unique(tile_indexes)]
+        positions = positions[self.free[positions]]
+        self.free[positions] = False
+        self.size -= len(positions)
+
+        # все предки в дереве обновляются сразу для всех удаляемых позиций
+        positions = positions + 1
+        while len(positions) > 0:
+            np.subtract.at(self.tree_array, positions, 1)
+            positions = positions + (positions & -positions)
+            positions = positions[positions < len(self.tree_array)]
+
+    def pop(self, number: int) -> int:
+        tile_index = self.get(number)
+        position = self.positions[tile_index]
+        self.free[position] = False
+        self.size -= 1
+
+        position += 1
+        tree = self.tree
+        length = len(tree)
+        while position < length:
+            tree[position] -= 1
+            position += position & -position
+        return tile_index
@@ -0,0 +1,214 @@
+import math
+from typing import Any, Iterable, TYPE_CHECKING
+
+from arcade import SpriteList, color
+from arcade.types import Color
+
+from core.service.coordinates import Coordinates
+from core.service.projection import ProjectionObject
+
+
+if TYPE_CHECKING:
+    from simulator.tile import Tile
+    from simulator.world import World
+
+
+class TileProjection(ProjectionObject):
+    main_color: Color = color.WHITE
+    selected_color: Color = color.GRAY
+
+    def __init__(self, tile: "Tile", coordinates: Coordinates) -> None:
+        self.tile = tile
+        self.real_coordinates = coordinates
+        super().__init__()
+        self.selected = False
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}{self.real_coordinates}"
+
+    def init(self, offset_x: float, offset_y: float, coeff: float, tilt_coeff: float) -> None:
+        sqrt = math.sqrt(3)
+
+        radius = coeff / 2
+        width = sqrt * radius
+        height = (2 * radius) * tilt_coeff
+        self.size = (width, height)
+        self.center_x = (sqrt * self.real_coordinates.x + sqrt / 2 * self.real_coordinates.y) * radius + offset_x
+        self.center_y = (3 / 2 * self.real_coordinates.y) * radius * tilt_coeff + offset_y
+        self.position = (self.center_x, self.center_y)
+
+    def select(self, world_map: "Map") -> None:
+        world_map.selected_tiles.add(self)
+        self.color = self.selected_color
+        self.selected = True
+
+    def deselect(self, world_map: "Map") -> None:
+        world_map.selected_tiles.remove(self)
+        self.color = self.main_color
+        self.selected = False
+
+    def on_click(self, world_map: "Map") -> None:
+        if self.selected:
+            self.deselect(world_map)
+        else:
+            self.select(world_map)
+
+
+class RegionProjection(ProjectionObject):
+    tile_projection: TileProjection
+
+
+class WorldObjectProjection(ProjectionObject):
+    tile_projection: "TileProjection"
+
+
+class BaseProjection(WorldObjectProjection):
+    main_color = color.RED_BROWN
+
+
+class CreatureProjection(WorldObjectProjection):
+    main_color = color.APRICOT
+
+
+class Map(ProjectionObject):
+    def __init__(self, width: int, height: int) -> None:
+        super().__init__()
+
+        # соотносится с центром окна
+        self.center_x = width // 2
+        self.center_y = height // 2
+        self.offset_x = self.center_x
+        self.offset_y = self.center_y
+
+        # множитель размера отображения мира
+        self.coeff: float | None = None
+        self.min_coeff = 1
+        self.max_coeff = 100
+        # возвышение, в градусах
+        self.elevation: float | None = None
+        self.tilt_coeff: float | None = None
+        self.min_elevation = 30
+        self.max_elevation = 90
+        # поворот, в градусах
+        self.rotation: float | None = None
+        self.centralize()
+
+        self.bases = SpriteList[BaseProjection]()
+        self.creatures = SpriteList[CreatureProjection]()
+        self.tiles = SpriteList[TileProjection]()
+
+        self.selected_tiles = set[TileProjection]()
+        self.inited = False
+
+    def init(self) -> Any:
+        self.init_tiles()
+        self.init_bases()
+        self.init_creatures()
+        self.inited = True
+
+    def init_tiles(self) -> None:
+        for tile in self.tiles:
+            tile.init(self.offset_x, self.offset_y, self.coeff, self.tilt_coeff)
+
+    def init_bases(self) -> None:
+        for base in self.bases:
+            base.position = base.tile_projection.position
+            base.size = base.tile_projection.size
+
+    def init_creatures(self) -> None:
+        for creature in self.creatures:
+            creature.position = creature.tile_projection.position
+            creature.size = creature.tile_projection.size
+
+    def reset(self) -> None:
+        self.inited = False
+
+    def start(self, world: "World") -> None:
+        """Создает проекции тайлов, регионов и объектов мира"""
+
+        for tile in world.tiles:
+            tile.projection = TileProjection(tile, tile.coordinates)
+        for region in world.regions:
+            region.projections = self.create_projections(RegionProjection, region.tiles)
+        for base in world.bases:
+            base.projections = self.create_projections(BaseProjection, base.tiles)
+            self.bases.extend(base.projections.values())
+        for creature in world.creatures:
+            creature.projections = self.create_projections(CreatureProjection, creature.tiles)
+            self.creatures.extend(creature.projections.values())
+        for tile in world.tiles:
+            self.tiles.append(tile.projection)
+
+    @staticmethod
+    def create_projections[T: ProjectionObject](
+            projection_class: type[T],
+            tiles: Iterable["Tile"]
+    ) -> dict["Tile", T]:
+        projections = {}
+        for tile in tiles:
+            projection = projection_class()
+            projection.tile_projection = tile.projection
+            projections[tile] = projection
+        return projections
+
+    def on_draw(self, draw_creatures: bool, draw_bases: bool, draw_tiles: bool) -> None:
+        if not self.inited:
+            self.init()
+
+        if draw_tiles:
+            self.tiles.draw()
+        if draw_bases:
+            self.bases.draw()
+        if draw_creatures:
+            self.creatures.draw()
+
+    def change_coeff(self, position_x: int, position_y: int, offset: int) -> None:
+        scroll_coeff = 10
+        coeff_offset = offset * self.coeff / self.max_coeff * scroll_coeff
+        old_coeff = self.coeff
+        self.coeff = max(min(self.coeff + coeff_offset, self.max_coeff), self.min_coeff)
+
+        if (coeff_diff := self.coeff - old_coeff) != 0:
+            move_coeff = -(1 - self.coeff / old_coeff)
+            if abs(coeff_diff - coeff_offset) < 0.01:
+                move_coeff = round(move_coeff, 1)
+            offset_x = (self.offset_x - position_x) * move_coeff
+            offset_y = (self.offset_y - position_y) * move_coeff
+            self.offset_x += offset_x
+            self.offset_y += offset_y
+
+        self.reset()
+
+    def centralize(self) -> None:
+        # todo: вызов данного метода должен перерисовывать карту так, чтобы она целиком помещалась на экране
+        self.coeff = 4
+        self.elevation = 90
+        self.tilt_coeff = 1
+        self.rotation = 0
+
+    def change_offset(self, offset_x: int, offset_y: int) -> None:
+        self.offset_x += offset_x
+        self.offset_y += offset_y
+        self.reset()
+
+    def change_tilt(self, offset: int) -> None:
+        coeff = 1 / 2
+        self.elevation = max(min(self.elevation + offset * coeff, self.max_elevation), self.min_elevation)
+        self.tilt_coeff = math.sin(math.radians(self.elevation))
+        self.reset()
+
+    def change_rotation(self, offset: int) -> None:
+        max_rotation = 360
+        self.rotation = (max_rotation + self.rotation + offset) % max_rotation
+        self.reset()
+
+    def point_to_coordinates(self, point_x: float, point_y: float) -> Coordinates:
+        sqrt = math.sqrt(3)
+
+        radius = self.coeff / 2
+        relative_x = point_x - self.offset_x
+        relative_y = point_y - self.offset_y
+        position_x = round((relative_x * sqrt / 3 - relative_y / 3) / radius)
+        position_y = round((relative_y * 2 / 3) / radius / self.tilt_coeff)
+
+        return Coordinates(position_x, position_y)
@@ -1,28 +1,38 @@
-import copy
-from typing import Any, Self, TYPE_CHECKING
+import bisect
+from typing import Any, Self, TYPE_CHECKING, Union
 
 from core.service.coordinates import Coordinates
-from core.service.object import PhysicalObject, ProjectionObject
+from core.service.object import PhysicalObject
+from simulator.audience import Audience
 from simulator.creature import Creature
-from simulator.tile import Tile, TileProjection
+from simulator.lattice import LazyNeighbours
+from simulator.scheduler import TimingWheel
+from simulator.tile import Tile
 
 
 if TYPE_CHECKING:
-    from simulator.world import BaseSet, CreatureSet, Regions2, Tiles2
+    from core.service.topology import Topology
+    from simulator.base import Base
+    from simulator.projection import RegionProjection
+    from simulator.world import BaseSet, CreatureSet, Regions2
 
 
-class RegionProjection(ProjectionObject):
-    tile_projection: TileProjection
-
-
-class Region(PhysicalObject):
-    projection_class = RegionProjection
-    projections: dict[Tile, projection_class]
+class Region(LazyNeighbours, PhysicalObject):
     neighbours: list[Self]
-    radius: int = None
 
-    def __init__(self, coordinates: Coordinates) -> None:
+    def __init__(
+            self,
+            coordinates: Coordinates,
+            topology: "Topology",
+            active_regions: set[Self],
+            audience: Audience
+    ) -> None:
         super().__init__()
+        self.topology = topology
+        # общее для мира множество регионов, в которых есть объекты
+        self.active_regions = active_regions
+        # общие для мира столбцы состояния существ
+        self.audience = audience
         self.coordinates = coordinates
         self.x = self.coordinates.x
         self.y = self.coordinates.y
@@ -30,50 +40,76 @@ class Region(PhysicalObject):
         self.a = self.coordinates.a
         self.b = self.coordinates.b
         self.c = self.coordinates.c
+        # номер в плотном индексе регионов мира
+        self.index: int | None = None
 
-        self.tiles: set[Tile] | None = None
-        self.neighbour_layers: dict[int, set[Self]] = {}
+        self.tiles: list[Tile] | None = None
+        # создаются при отображении мира
+        self.projections: dict[Tile, "RegionProjection"] | None = None
         self.bases: BaseSet = []
         self.creatures: CreatureSet = []
+        # те же объекты, разложенные по тикам, в которые они действуют
+        self.base_wheel = TimingWheel["Base"]()
+        self.creature_wheel = TimingWheel[Creature]()
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}({self.coordinates})"
 
-    def on_update(self, time: int, regions_2: "Regions2", bases: "BaseSet") -> Any:
-        for base in self.bases:
-            if time % base.act_period == base.act_remainder:
-                base.on_update(time, regions_2)
-        for creature in self.creatures:
-            if time % creature.act_period == creature.act_remainder:
-                creature.on_update(time, regions_2, bases)
+    def __lt__(self, other: Self) -> bool:
+        # регионы могут создаваться лениво, поэтому порядок задается номером в индексе, а не идентификатором
+        return self.index < other.index
+
+    def on_update(self, time: int, regions_2: "Regions2", bases: "BaseSet") -> list[Union["Base", Creature]]:
+        """Возвращает объекты, измененные при обработке региона, в том числе в соседних регионах"""
+
+        return [*self.update_bases(time, regions_2), *self.update_creatures(time, regions_2, bases)]
+
+    def update_bases(self, time: int, regions_2: "Regions2") -> list["Base"]:
+        changed_objects = []
+        # объект, перешедший во время тика в еще не обработанный регион, не должен действовать повторно
+        for base in self.base_wheel.get_due(time):
+            if base.last_acting_time != time:
+                changed_objects.extend(base.on_update(time, regions_2))
+        return changed_objects
+
+    def update_creatures(self, time: int, regions_2: "Regions2", bases: "BaseSet") -> list[Creature]:
+        changed_objects = []
+        for creature in self.creature_wheel.get_due(time):
+            if creature.last_acting_time != time:
+                changed = creature.on_update(time, regions_2, bases)
+                self.audience.update(changed)
+                changed_objects.extend(changed)
+        return changed_objects
 
     def after_update(self) -> Any:
         pass
 
-    def init(self, tiles_2: "Tiles2", regions_2: "Regions2") -> Any:
-        self.projections = {}
-        for tile in self.tiles:
-            projection = self.projection_class()
-            self.projections[tile] = projection
-            projection.tile_projection = tile.projection
-
-        neighbour_indexes = [index.fix_to_cycle(tiles_2) for index in self.coordinates.get_region_neighbour_centers()]
-        self.neighbours = [regions_2[index.x][index.y] for index in neighbour_indexes]
-
-    def get_creatures(self, radius: int, regions_2: "Regions2") -> list[Creature]:
-        # noinspection PyTypeChecker
-        creatures: list[Creature] = copy.copy(self.creatures)
-        layers = radius // self.radius + 1
-
-        if layers not in self.neighbour_layers:
-            region_indexes = set()
-            region_indexes.add(self.coordinates)
-            region_indexes = Coordinates.append_layers(regions_2, region_indexes, layers)
-            regions = set(regions_2[index.x][index.y] for index in region_indexes)
-            self.neighbour_layers[layers] = regions
-        regions = self.neighbour_layers[layers]
-
-        for region in regions:
-            creatures.extend(region.creatures)
-
-        return creatures
+    # соседи берутся из Topology.region_neighbours
+    def init(self, neighbours: list[Self]) -> Any:
+        self.neighbours = neighbours
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.bases and not self.creatures
+
+    def add_object(self, world_object: Union["Base", Creature]) -> None:
+        if self.is_empty:
+            self.active_regions.add(self)
+        # списки упорядочены по идентификаторам, чтобы порядок действий и криков не зависел от порядка переходов
+        # между регионами - он разный при обработке одним процессом, шардами и при восстановлении из снимка
+        if world_object.is_base:
+            bisect.insort(self.bases, world_object)
+            self.base_wheel.add(world_object)
+        else:
+            bisect.insort(self.creatures, world_object)
+            self.creature_wheel.add(world_object)
+
+    def remove_object(self, world_object: Union["Base", Creature]) -> None:
+        if world_object.is_base:
+            self.bases.remove(world_object)
+            self.base_wheel.remove(world_object)
+        else:
+            self.creatures.remove(world_object)
+            self.creature_wheel.remove(world_object)
+        if self.is_empty:
+            self.active_regions.discard(self)
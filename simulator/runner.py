@@ -0,0 +1,115 @@
+import argparse
+import time
+
+from core.service.settings import Settings
+from simulator.checkpoint import Checkpoint
+from simulator.world import World
+
+
+class Runner:
+    """Симуляция без окна: мир обновляется с максимально возможной скоростью"""
+
+    def __init__(
+            self,
+            world_radius: int,
+            region_radius: int,
+            population: int,
+            bases_number: int,
+            seed: int = None,
+            checkpoint_path: str = None
+    ) -> None:
+        timestamp = time.perf_counter()
+        # из снимка мир восстанавливается с его собственными параметрами
+        if checkpoint_path is not None:
+            self.world = Checkpoint.load(checkpoint_path).restore()
+        else:
+            self.world = World(world_radius, region_radius, population, bases_number, seed)
+            self.world.start()
+        self.start_time = time.perf_counter() - timestamp
+        self.ticks = 0
+        self.run_time = 0
+
+    @property
+    def tps(self) -> float:
+        try:
+            tps = self.ticks / self.run_time
+        except ZeroDivisionError:
+            tps = 0
+        return tps
+
+    def run(self, ticks: int) -> None:
+        timestamp = time.perf_counter()
+        for _ in range(ticks):
+            self.world.on_update(1)
+        self.run_time += time.perf_counter() - timestamp
+        self.ticks += ticks
+
+    def stop(self) -> None:
+        self.world.stop()
+
+    def get_summary(self) -> str:
+        return "\n".join((
+            f"Зерно: {self.world.seed}",
+            f"Тайлы: {len(self.world.tiles)}, регионы: {len(self.world.regions)}",
+            f"Существа: {len(self.world.creatures)}, базы: {len(self.world.bases)}",
+            f"Подготовка мира: {self.start_time:.3f} с",
+            f"Тики: {self.ticks} за {self.run_time:.3f} с, tps: {self.tps:.1f}",
+            f"Возраст мира: {self.world.age}"
+        ))
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = "Симуляция без окна")
+    parser.add_argument("--world-radius", type = int, default = 10, help = "радиус мира в радиусах регионов")
+    parser.add_argument("--region-radius", type = int, default = 5, help = "радиус региона в тайлах")
+    parser.add_argument("--population", type = int, default = 500)
+    parser.add_argument("--bases", type = int, default = 5)
+    parser.add_argument("--ticks", type = int, default = 1000)
+    parser.add_argument("--seed", type = int, default = None)
+    parser.add_argument("--threads", type = int, default = None, help = "потоки для обработки регионов")
+    parser.add_argument("--processes", type = int, default = None, help = "процессы, обрабатывающие шарды мира")
+    parser.add_argument("--engine", choices = ("objects", "arrays"), default = None, help = "обработка существ")
+    parser.add_argument("--listeners", choices = ("layers", "radius"), default = None, help = "слушатели крика")
+    parser.add_argument("--screams", choices = ("creatures", "regions"), default = None, help = "передача криков")
+    parser.add_argument("--lazy-regions", action = "store_true", help = "создавать регионы и тайлы по мере обращения")
+    parser.add_argument("--checkpoint-period", type = int, default = None, help = "период снимков мира в тиках")
+    parser.add_argument("--restore", default = None, help = "снимок мира, с которого продолжается симуляция")
+    return parser.parse_args()
+
+
+def simulate() -> None:
+    arguments = parse_arguments()
+    # Settings() заново выполняет __init__ и сбрасывает значения, поэтому все настройки задаются через один объект
+    settings = Settings()
+    if arguments.threads is not None:
+        settings.SIMULATION_THREADS = arguments.threads
+    if arguments.processes is not None:
+        settings.SIMULATION_PROCESSES = arguments.processes
+    if arguments.engine is not None:
+        settings.CREATURE_ENGINE = arguments.engine
+    if arguments.listeners is not None:
+        settings.SCREAM_LISTENERS = arguments.listeners
+    if arguments.screams is not None:
+        settings.SCREAM_PROPAGATION = arguments.screams
+    if arguments.lazy_regions:
+        settings.LAZY_REGIONS = True
+    if arguments.checkpoint_period is not None:
+        settings.CHECKPOINT_PERIOD = arguments.checkpoint_period
+    runner = Runner(
+        arguments.world_radius,
+        arguments.region_radius,
+        arguments.population,
+        arguments.bases,
+        arguments.seed,
+        arguments.restore
+    )
+    try:
+        runner.run(arguments.ticks)
+    finally:
+        runner.stop()
+    print(runner.get_summary())
+
+
+# python -m simulator.runner --ticks 1000 --seed 0
+if __name__ == "__main__":
+    simulate()
@@ -0,0 +1,141 @@
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Protocol, Self, Sequence, TYPE_CHECKING
+
+import numpy as np
+
+from core.service.coordinates import Coordinates
+
+
+if TYPE_CHECKING:
+    from simulator.lattice import LatticeIndex
+    from simulator.region import Region
+
+
+class Scheduled(Protocol):
+    act_period: int
+    act_remainder: int
+
+    def __lt__(self, other: Self) -> bool: ...
+
+
+class TimingWheel[T: Scheduled]:
+    """Объекты, разложенные по корзинам остатка act_remainder для каждого act_period, корзины упорядочены"""
+
+    def __init__(self) -> None:
+        # {act_period: [корзина для каждого остатка]}
+        self.wheels: dict[int, list[list[T]]] = {}
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[T]:
+        for buckets in self.wheels.values():
+            for bucket in buckets:
+                yield from bucket
+
+    def add(self, scheduled: T) -> None:
+        if scheduled.act_period not in self.wheels:
+            self.wheels[scheduled.act_period] = [[] for _ in range(scheduled.act_period)]
+        bisect.insort(self.wheels[scheduled.act_period][scheduled.act_remainder], scheduled)
+        self.size += 1
+
+    def remove(self, scheduled: T) -> None:
+        self.wheels[scheduled.act_period][scheduled.act_remainder].remove(scheduled)
+        self.size -= 1
+
+    def get_due(self, time: int) -> list[T]:
+        """Копия списка объектов, действующих в момент time, - объекты могут перемещаться во время обхода"""
+
+        due = []
+        for period, buckets in self.wheels.items():
+            due.extend(buckets[time % period])
+        return due
+
+
+class RegionScheduler:
+    """Раскраска регионов: регионы одного цвета не влияют друг на друга и могут обрабатываться одновременно
+
+    Регионы четных полос карты обрабатываются раньше нечетных, на этом построено разбиение мира в Shards.
+    """
+
+    def __init__(
+            self,
+            regions: "LatticeIndex[Region]",
+            conflict_offsets: Sequence[Coordinates],
+            threads: int = 1
+    ) -> None:
+        self.regions = regions
+        # смещения регионов, обработка которых может затронуть общие объекты, из World.get_interaction_offsets
+        self.conflict_offsets = conflict_offsets
+        # (N, K) номера конфликтующих регионов, карта зациклена, поэтому таблица может содержать повторы
+        self.conflicts = self.get_conflicts()
+        self.bands_number, self.bands = self.get_bands()
+        self.colors = self.get_colors()
+        self.colors_number = int(self.colors.max()) + 1 if len(self.colors) > 0 else 0
+
+        if threads > 1:
+            self.executor = ThreadPoolExecutor(threads, "region")
+        else:
+            self.executor = None
+
+    def get_conflicts(self) -> np.ndarray:
+        return self.regions.topology.get_neighbour_table(
+            self.regions.coordinates_array,
+            self.regions.indexes_array,
+            self.conflict_offsets
+        )
+
+    def get_bands(self) -> tuple[int, np.ndarray]:
+        """Количество полос и полоса каждого региона
+
+        Полосы нарезаются по линейной функции, равной нулю на втором векторе зеркальных центров и size на первом,
+        поэтому ее значение по модулю size не зависит от выбора образа региона на зацикленной карте.
+        """
+
+        topology = self.regions.topology
+        mirror = topology.mirror_centers[1]
+        centers = self.regions.coordinates_array
+        values = (centers[:, 0] * mirror.y - centers[:, 1] * mirror.x) % topology.size
+        # полоса не уже наибольшего изменения функции между конфликтующими регионами
+        reach = max((abs(x.x * mirror.y - x.y * mirror.x) for x in self.conflict_offsets), default = 1)
+        bands_number = max(topology.size // reach // 2 * 2, 2)
+        return bands_number, (values * bands_number // topology.size).astype(np.int32)
+
+    def get_colors(self) -> np.ndarray:
+        """Жадная раскраска графа конфликтов: сначала регионы четных полос, затем нечетных, в порядке номеров"""
+
+        colors = np.full(len(self.regions), -1, dtype = np.int32)
+        first_color = 0
+        for parity in range(2):
+            for index in np.flatnonzero(self.bands % 2 == parity).tolist():
+                used = colors[self.conflicts[index]] - first_color
+                used = used[used >= 0]
+                free = np.ones(len(used) + 1, dtype = np.bool_)
+                free[used[used <= len(used)]] = False
+                colors[index] = first_color + free.argmax()
+            first_color = int(colors.max(initial = -1)) + 1
+        return colors
+
+    def get_phases(self, regions: Iterable["Region"]) -> list[list["Region"]]:
+        """Регионы, сгруппированные по цветам, - порядок не зависит от количества потоков"""
+
+        phases = [[] for _ in range(self.colors_number)]
+        colors = self.colors
+        for region in sorted(regions):
+            phases[colors[region.index]].append(region)
+        return [x for x in phases if x]
+
+    def run(self, regions: Iterable["Region"], function: Callable[["Region"], Any]) -> None:
+        for phase in self.get_phases(regions):
+            if self.executor is None or len(phase) == 1:
+                for region in phase:
+                    function(region)
+            else:
+                # list - чтобы дождаться окончания фазы и пробросить исключения
+                list(self.executor.map(function, phase))
+
+    def stop(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
@@ -0,0 +1,95 @@
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from core.service.object import Object
+from simulator.creature import Creature
+
+
+if TYPE_CHECKING:
+    from simulator.world import World
+
+
+class RegionScreams(Object):
+    """Лучшие за тик крики о каждой базе, собранные по регионам, - режим "regions" у SCREAM_PROPAGATION"""
+
+    def __init__(self, world: "World") -> None:
+        super().__init__()
+        self.topology = world.topology
+        self.region_centers = world.regions.coordinates_array
+        self.region_indexes = world.regions.indexes_array
+        # ключ класса вычетов тайла -> номер региона
+        self.key_regions = np.asarray(world.geometry["tile_regions"])[world.tiles.indexes_array]
+        # (R, K) регионы, существ которых слышно из региона, те же, что при SCREAM_LISTENERS == "layers"
+        self.neighbourhoods = self.topology.get_layer_table(
+            self.region_centers,
+            self.region_indexes,
+            self.topology.get_scream_layers(Creature.scream_radius)
+        )
+
+    def propagate(
+            self,
+            criers: np.ndarray,
+            counters: np.ndarray,
+            listeners: np.ndarray,
+            x: np.ndarray,
+            y: np.ndarray,
+            finish_bases: np.ndarray,
+            hear_radiuses: np.ndarray,
+            heard_distances: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Слушатели, для которых нашелся путь до базы короче услышанного, новые расстояния и кричащие
+
+        criers - номера кричавших за тик существ, counters - (C, B) их счетчики баз, listeners - номера слушателей,
+        остальные столбцы - по всем существам.
+        """
+
+        if len(criers) == 0 or len(listeners) == 0:
+            return listeners[:0], listeners[:0], listeners[:0]
+        bases_number = counters.shape[1]
+        # лучший крик региона по каждой базе, при равенстве - кричащий с меньшим номером
+        cells = (self.key_regions[self.topology.get_cycle_keys(x[criers], y[criers])][:, np.newaxis] * bases_number
+                 + np.arange(bases_number)).ravel()
+        values = counters.ravel()
+        owners = np.repeat(criers, bases_number)
+        order = np.lexsort((owners, values, cells))
+        cells, first = np.unique(cells[order], return_index = True)
+        # плотная таблица (регион, база), последняя ячейка - для отсутствующих соседей с номером -1
+        region_values = np.full(len(self.region_centers) * bases_number + 1, math.inf)
+        region_owners = np.zeros(len(region_values), dtype = np.int64)
+        region_values[cells] = values[order][first]
+        region_owners[cells] = owners[order][first]
+
+        # лучший крик окрестности региона слушателя по каждой базе
+        listener_x = x[listeners]
+        listener_y = y[listeners]
+        listener_regions, inverse = np.unique(
+            self.key_regions[self.topology.get_cycle_keys(listener_x, listener_y)],
+            return_inverse = True
+        )
+        neighbourhoods = self.neighbourhoods[listener_regions][:, :, np.newaxis]
+        queries = np.where(neighbourhoods >= 0, neighbourhoods * bases_number + np.arange(bases_number), -1)
+        values = region_values[queries]
+        owners = region_owners[queries]
+        centers = self.region_centers[listener_regions]
+        center_distances = self.topology.distance_3_array[self.topology.get_cycle_keys(
+            x[owners] - centers[:, 0, np.newaxis, np.newaxis],
+            y[owners] - centers[:, 1, np.newaxis, np.newaxis]
+        )]
+        # (U, 1, B) номер лучшего региона окрестности
+        best = (values + center_distances).argmin(axis = 1)[:, np.newaxis]
+        region_owners = np.take_along_axis(owners, best, axis = 1)[:, 0]
+        region_values = np.take_along_axis(values, best, axis = 1)[:, 0]
+
+        # слушатель сравнивает с услышанным ранее лучший крик своего региона о своей финальной базе
+        listener_bases = finish_bases[listeners]
+        sources = region_owners[inverse, listener_bases]
+        distances = self.topology.distance_3_array[
+            self.topology.get_cycle_keys(x[sources] - listener_x, y[sources] - listener_y)
+        ]
+        base_distances = region_values[inverse, listener_bases] + distances
+        heard = ((sources != listeners) & (distances <= hear_radiuses[listeners])
+                 & (base_distances < heard_distances[listeners]))
+        # у услышавших расстояние конечно, в объектах существ оно целое
+        return listeners[heard], base_distances[heard].astype(np.int64), sources[heard]
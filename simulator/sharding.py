@@ -0,0 +1,247 @@
+import multiprocessing
+from multiprocessing.connection import Connection
+from typing import Any, TYPE_CHECKING, Union
+
+import numpy as np
+
+from core.service.coordinates import Coordinates
+from core.service.object import Object
+from core.service.settings import Settings
+from simulator.creature import Creature
+
+
+if TYPE_CHECKING:
+    from simulator.base import Base
+    from simulator.region import Region
+    from simulator.world import World
+    from simulator.world_object import State
+
+
+# [(номер объекта в [*bases, *creatures], состояние)]
+type Delta = list[tuple[int, "State"]]
+
+
+class Shards(Object):
+    """Разбиение регионов между процессами по парам полос RegionScheduler, общее для координатора и исполнителей"""
+
+    def __init__(self, world: "World", shards_number: int) -> None:
+        super().__init__()
+        self.world = world
+        self.shards_number = shards_number
+        scheduler = world.region_scheduler
+        regions = world.regions
+        topology = world.topology
+
+        self.owners = (scheduler.bands // 2 * shards_number // (scheduler.bands_number // 2)).astype(np.int32)
+        # (R, S) регион свой для шарда или в его гало
+        halo = topology.get_neighbour_table(regions.coordinates_array, regions.indexes_array, self.get_halo_offsets())
+        self.known = np.zeros((len(regions), shards_number), dtype = np.bool_)
+        self.known[halo, self.owners[:, np.newaxis]] = True
+        # (R, S) изменения объектов региона получают шарды, знающие его или соседний регион - объект мог прийти оттуда
+        adjacent = topology.get_neighbour_table(
+            regions.coordinates_array,
+            regions.indexes_array,
+            Coordinates.get_range_offsets(1, topology.region_unit)
+        )
+        self.recipients = self.known[adjacent].any(axis = 1)
+        self.tile_regions = np.asarray(world.geometry["tile_regions"])
+        # номер -> объект, у исполнителя - только известные ему объекты
+        self.objects: dict[int, Union["Base", "Creature"]] = {
+            self.get_number(x): x for x in [*world.bases, *world.creatures]
+        }
+
+    def get_halo_offsets(self) -> list[Coordinates]:
+        offsets = list(self.world.get_interaction_offsets()[0])
+        if self.world.region_screams is not None:
+            # регионы, крики которых слышат слушатели своих регионов
+            topology = self.world.topology
+            offsets.extend(Coordinates.get_range_offsets(
+                topology.get_scream_layers(Creature.scream_radius),
+                topology.region_unit
+            ))
+        return list(dict.fromkeys(offsets))
+
+    def get_number(self, world_object: Union["Base", "Creature"]) -> int:
+        return world_object.id if world_object.is_base else self.world.bases_number + world_object.id
+
+    def apply_delta(self, delta: Delta, shard: int = None) -> None:
+        """Переносит состояния объектов в мир шарда, None - в полный мир координатора
+
+        Объекты, пришедшие в известные шарду регионы, создаются, покинувшие их - удаляются, базы есть у всех.
+        """
+
+        world = self.world
+        known = [shard is None or self.known[self.tile_regions[state[0]], shard] for _, state in delta]
+        objects = [self.objects.get(number) for number, _ in delta]
+        # сначала освобождаются все тайлы, так как объекты могут занимать тайлы друг друга
+        for world_object in objects:
+            if world_object is not None:
+                world_object.release_tiles()
+
+        updated = []
+        for (number, state), world_object, is_known in zip(delta, objects, known):
+            if world_object is None:
+                if is_known:
+                    world_object = world.restore_object(number, state)
+                    self.objects[number] = world_object
+                    world.audience.add(world_object)
+            elif is_known or world_object.is_base:
+                world_object.set_state(state, world.tiles, world.bases_by_id)
+                updated.append(world_object)
+            else:
+                world_object.center_tile.region.remove_object(world_object)
+                world.creatures.remove(world_object)
+                world.audience.remove(world_object)
+                del self.objects[number]
+        for world_object in updated:
+            world_object.occupy_tiles()
+        world.audience.update(updated)
+
+
+class ShardCoordinator(Shards):
+    """Процессы-исполнители обрабатывают свои шарды, координатор пересылает изменения на границах
+
+    Объекты мира координатора обновляются только в sync - для снимков и отображения.
+    """
+
+    def __init__(self, world: "World", shards_number: int) -> None:
+        super().__init__(world, shards_number)
+        context = multiprocessing.get_context("spawn")
+        base_states = [(self.get_number(x), x.get_state()) for x in world.bases]
+        self.connections: list[Connection] = []
+        self.processes = []
+        for shard in range(self.shards_number):
+            connection, worker_connection = context.Pipe()
+            creature_states = [
+                (self.get_number(x), x.get_state()) for x in world.creatures
+                if self.known[x.center_tile.region.index, shard]
+            ]
+            process = context.Process(
+                target = ShardWorker.run,
+                args = (
+                    worker_connection,
+                    shard,
+                    self.shards_number,
+                    world.get_arguments(),
+                    world.age,
+                    [*base_states, *creature_states],
+                    vars(self.settings)
+                ),
+                name = f"shard_{shard}",
+                daemon = True
+            )
+            process.start()
+            self.connections.append(connection)
+            self.processes.append(process)
+        for connection in self.connections:
+            connection.recv()
+        self.synchronized = True
+
+    def on_update(self, delta_time: int) -> None:
+        for connection in self.connections:
+            connection.send(("update", delta_time))
+        # шаги регионов четных и нечетных полос
+        for _ in range(2):
+            outboxes = [connection.recv() for connection in self.connections]
+            for shard, connection in enumerate(self.connections):
+                connection.send([x[shard] for x in outboxes if shard in x])
+        self.synchronized = False
+
+    def sync(self) -> None:
+        if not self.synchronized:
+            for connection in self.connections:
+                connection.send(("collect", None))
+            for connection in self.connections:
+                self.apply_delta(connection.recv())
+            self.synchronized = True
+
+    def stop(self) -> None:
+        for connection in self.connections:
+            connection.send(None)
+        for process in self.processes:
+            process.join()
+
+
+class ShardWorker(Shards):
+    def __init__(self, world: "World", shards_number: int, shard: int, connection: Connection) -> None:
+        super().__init__(world, shards_number)
+        self.shard = shard
+        self.connection = connection
+
+    @classmethod
+    def run(
+            cls,
+            connection: Connection,
+            shard: int,
+            shards_number: int,
+            world_arguments: tuple,
+            age: int,
+            objects: Delta,
+            settings_values: dict[str, Any]
+    ) -> None:
+        from simulator.world import World
+
+        # новый процесс получает настройки по умолчанию, а шард должен обрабатываться так же, как у координатора,
+        # но в одном процессе, снимки делает координатор
+        settings = Settings()
+        vars(settings).update(settings_values)
+        settings.SIMULATION_PROCESSES = 1
+        settings.CHECKPOINT_PERIOD = 0
+        # геометрия загружается из TopologyCache, сохраненного координатором
+        world = World(*world_arguments)
+        world.age = age
+        for number, state in objects:
+            world.restore_object(number, state)
+        world.start_simulation()
+        worker = cls(world, shards_number, shard, connection)
+        connection.send(True)
+
+        while (message := connection.recv()) is not None:
+            command, argument = message
+            if command == "update":
+                worker.on_update(argument)
+            else:
+                connection.send(worker.get_own_objects())
+        world.stop()
+
+    def get_own_regions(self) -> list["Region"]:
+        return [x for x in self.world.active_regions if self.owners[x.index] == self.shard]
+
+    def get_own_objects(self) -> Delta:
+        """Состояния объектов своих регионов - объекты гало обрабатываются другими шардами"""
+
+        objects = [x for region in self.get_own_regions() for x in (*region.bases, *region.creatures)]
+        return sorted((self.get_number(x), x.get_state()) for x in objects)
+
+    def on_update(self, delta_time: int) -> None:
+        world = self.world
+        world.age += delta_time
+        scheduler = world.region_scheduler
+        # как и без шардов, обрабатываются регионы, в которых были объекты в начале тика
+        regions = self.get_own_regions()
+        for parity in range(2):
+            changed_objects = []
+            for phase in scheduler.get_phases(x for x in regions if scheduler.bands[x.index] % 2 == parity):
+                for region in phase:
+                    changed_objects.extend(region.on_update(world.age, world.regions_2, world.bases))
+            self.connection.send(self.get_deltas(changed_objects))
+            for delta in self.connection.recv():
+                self.apply_delta(delta, self.shard)
+
+        if world.region_screams is not None:
+            # слушатели гало получают крики в своих шардах
+            listeners = [x.id for region in self.get_own_regions() for x in region.creatures]
+            world.propagate_screams(np.array(sorted(listeners), dtype = np.int64))
+        for region in sorted(world.active_regions):
+            region.after_update()
+
+    def get_deltas(self, changed_objects: list[Union["Base", "Creature"]]) -> dict[int, Delta]:
+        """Изменения шага для каждого шарда, которому они нужны"""
+
+        deltas: dict[int, Delta] = {}
+        for number, world_object in sorted({self.get_number(x): x for x in changed_objects}.items()):
+            state = world_object.get_state()
+            for shard in np.flatnonzero(self.recipients[world_object.center_tile.region.index]).tolist():
+                if shard != self.shard:
+                    deltas.setdefault(shard, []).append((number, state))
+        return deltas
@@ -14,7 +14,8 @@ from matplotlib import pyplot
 
 from core.service.object import ThirdPartyMixin
 from simulator.creature import Creature
-from simulator.tile import Tile, TileProjection
+from simulator.projection import Map, TileProjection
+from simulator.tile import Tile
 from simulator.world import World
 
 
@@ -340,13 +341,11 @@ class Window(arcade.Window, ThirdPartyMixin):
         self.timings = defaultdict(lambda: deque(maxlen = self.settings.TIMINGS_LENGTH))
 
     def start(self) -> None:
-        self.world = World(10, 5, 500, 5, self.width, self.height)
+        self.world = World(10, 5, 500, 5)
         self.world.start()
 
-        creature_projections = (y for x in self.world.creatures for y in x.projections.values())
-        base_projections = (y for x in self.world.bases for y in x.projections.values())
-        tile_projections = (x.projection for x in self.world.tile_set)
-        self.world.map.start(creature_projections, base_projections, tile_projections)
+        self.world.map = Map(self.width, self.height)
+        self.world.map.start(self.world)
 
         self.construct_tabs()
         self.construct_graphs()
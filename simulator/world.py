@@ -1,154 +1,40 @@
 import datetime
-import math
 import random
-from collections import defaultdict
-from typing import Any, Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from core.service.coordinates import Coordinates, NEIGHBOUR_OFFSETS
+from core.service.object import IdAllocator, Object
+from core.service.topology import Topology, TopologyCache
+from simulator.action import Move
+from simulator.audience import Audience
+from simulator.base import Base
+from simulator.checkpoint import Checkpoint, CheckpointWriter
+from simulator.creature import Creature
+from simulator.engine import CreatureEngine
+from simulator.lattice import LatticeIndex, LatticeView2, LazyLatticeIndex
+from simulator.placement import FreeTiles
+from simulator.counter_random import CounterRandom
+from simulator.region import Region
+from simulator.scheduler import RegionScheduler
+from simulator.screams import RegionScreams
+from simulator.sharding import ShardCoordinator
+from simulator.tile import Tile
 
-from arcade import SpriteList
 
-from core.service.coordinates import Coordinates
-from core.service.object import Object, ProjectionObject
-from simulator.base import Base, BaseProjection
-from simulator.creature import Creature, CreatureProjection
-from simulator.region import Region
-from simulator.tile import Tile, TileProjection
+if TYPE_CHECKING:
+    from simulator.projection import Map
+    from simulator.world_object import State
 
 
-type Tiles2 = dict[int, dict[int, Tile]]
-type Regions2 = dict[int, dict[int, Region]]
+type Tiles2 = LatticeView2[Tile]
+type Regions2 = LatticeView2[Region]
 type CreatureSet = list[Creature]
 type BaseSet = list[Base]
 
 
-class Map(ProjectionObject):
-    def __init__(self, width: int, height: int) -> None:
-        super().__init__()
-
-        # соотносится с центром окна
-        self.center_x = width // 2
-        self.center_y = height // 2
-        self.offset_x = self.center_x
-        self.offset_y = self.center_y
-
-        # множитель размера отображения мира
-        self.coeff: float | None = None
-        self.min_coeff = 1
-        self.max_coeff = 100
-        # возвышение, в градусах
-        self.elevation: float | None = None
-        self.tilt_coeff: float | None = None
-        self.min_elevation = 30
-        self.max_elevation = 90
-        # поворот, в градусах
-        self.rotation: float | None = None
-        self.centralize()
-
-        self.bases = SpriteList[BaseProjection]()
-        self.creatures = SpriteList[CreatureProjection]()
-        self.tiles = SpriteList[TileProjection]()
-
-        self.selected_tiles = set[TileProjection]()
-        self.inited = False
-
-    def init(self) -> Any:
-        self.init_tiles()
-        self.init_bases()
-        self.init_creatures()
-        self.inited = True
-
-    def init_tiles(self) -> None:
-        for tile in self.tiles:
-            tile.init(self.offset_x, self.offset_y, self.coeff, self.tilt_coeff)
-
-    def init_bases(self) -> None:
-        for base in self.bases:
-            base.position = base.tile_projection.position
-            base.size = base.tile_projection.size
-
-    def init_creatures(self) -> None:
-        for creature in self.creatures:
-            creature.position = creature.tile_projection.position
-            creature.size = creature.tile_projection.size
-
-    def reset(self) -> None:
-        self.inited = False
-
-    def start(
-            self,
-            creatures: Iterable[CreatureProjection],
-            bases: Iterable[BaseProjection],
-            tiles: Iterable[TileProjection]
-    ) -> None:
-        for projection in bases:
-            self.bases.append(projection)
-        for projection in creatures:
-            self.creatures.append(projection)
-        for projection in tiles:
-            self.tiles.append(projection)
-
-    def on_draw(self, draw_creatures: bool, draw_bases: bool, draw_tiles: bool) -> None:
-        if not self.inited:
-            self.init()
-
-        if draw_tiles:
-            self.tiles.draw()
-        if draw_bases:
-            self.bases.draw()
-        if draw_creatures:
-            self.creatures.draw()
-
-    def change_coeff(self, position_x: int, position_y: int, offset: int) -> None:
-        scroll_coeff = 10
-        coeff_offset = offset * self.coeff / self.max_coeff * scroll_coeff
-        old_coeff = self.coeff
-        self.coeff = max(min(self.coeff + coeff_offset, self.max_coeff), self.min_coeff)
-
-        if (coeff_diff := self.coeff - old_coeff) != 0:
-            move_coeff = -(1 - self.coeff / old_coeff)
-            if abs(coeff_diff - coeff_offset) < 0.01:
-                move_coeff = round(move_coeff, 1)
-            offset_x = (self.offset_x - position_x) * move_coeff
-            offset_y = (self.offset_y - position_y) * move_coeff
-            self.offset_x += offset_x
-            self.offset_y += offset_y
-
-        self.reset()
-
-    def centralize(self) -> None:
-        # todo: вызов данного метода должен перерисовывать карту так, чтобы она целиком помещалась на экране
-        self.coeff = 4
-        self.elevation = 90
-        self.tilt_coeff = 1
-        self.rotation = 0
-
-    def change_offset(self, offset_x: int, offset_y: int) -> None:
-        self.offset_x += offset_x
-        self.offset_y += offset_y
-        self.reset()
-
-    def change_tilt(self, offset: int) -> None:
-        coeff = 1 / 2
-        self.elevation = max(min(self.elevation + offset * coeff, self.max_elevation), self.min_elevation)
-        self.tilt_coeff = math.sin(math.radians(self.elevation))
-        self.reset()
-
-    def change_rotation(self, offset: int) -> None:
-        max_rotation = 360
-        self.rotation = (max_rotation + self.rotation + offset) % max_rotation
-        self.reset()
-
-    def point_to_coordinates(self, point_x: float, point_y: float) -> Coordinates:
-        sqrt = math.sqrt(3)
-
-        radius = self.coeff / 2
-        relative_x = point_x - self.offset_x
-        relative_y = point_y - self.offset_y
-        position_x = round((relative_x * sqrt / 3 - relative_y / 3) / radius)
-        position_y = round((relative_y * 2 / 3) / radius / self.tilt_coeff)
-
-        return Coordinates(position_x, position_y)
-
-
 class World(Object):
     def __init__(
             self,
@@ -156,123 +42,374 @@ class World(Object):
             region_radius: int,
             population: int,
             bases_number: int,
-            map_width: int,
-            map_height: int,
             seed: int = None
     ) -> None:
         super().__init__()
-        Coordinates.world_radius = world_radius
-        Coordinates.region_radius = region_radius
+        # идентификаторы объектов отсчитываются для каждого мира отдельно, чтобы результат зависел только от seed
+        self.ids = IdAllocator()
 
         if seed is None:
             seed = datetime.datetime.now().timestamp()
         self.seed = seed
         self.population = population
         self.bases_number = bases_number
-        random.seed(self.seed)
+        # поток для расстановки объектов, глобальный random не используется, чтобы результат зависел только от seed
+        self.random_generator = CounterRandom(random.Random(self.seed).getrandbits(64))
+        # ключ, от которого по идентификаторам порождаются потоки объектов
+        self.random_key = random.Random(f"{self.seed}_objects").getrandbits(64)
 
         self.age = 0
         self.center_x = 0
         self.center_y = 0
+        self.topology = Topology(world_radius, region_radius)
         # в тайлах
-        Region.radius = region_radius
-        self.region_radius = Region.radius
+        self.region_radius = self.topology.region_radius
         # количество радиусов региона в радиусе мира
-        self.world_radius = world_radius
-        self.radius = self.world_radius * (self.region_radius * 2 + 1) + self.region_radius
+        self.world_radius = self.topology.world_radius
+        self.radius = self.topology.radius
 
         self.creatures: CreatureSet = []
         self.bases: BaseSet = []
-        self.tiles_2: Tiles2 = defaultdict(dict)
-        Coordinates.tiles_2 = self.tiles_2
-        self.tile_set = set[Tile]()
-        self.regions_2: Regions2 = defaultdict(dict)
-        self.region_set = set[Region]()
-        self.map = Map(map_width, map_height)
+        self.bases_by_id: dict[int, Base] = {}
+        # регионы и тайлы регионов упорядочены по спирали от центра, соседние номера - соседние на карте объекты
+        self.tiles = LatticeIndex[Tile](self.topology)
+        # tiles_2[x][y]
+        self.tiles_2: Tiles2 = self.tiles.view_2
+        self.regions = LatticeIndex[Region](self.topology)
+        # regions_2[x][y]
+        self.regions_2: Regions2 = self.regions.view_2
+        # регионы, в которых есть базы или существа, пустые регионы не обновляются
+        self.active_regions = set[Region]()
+        self.audience = Audience(self.topology)
+        # создается после размещения объектов, так как раскраска зависит от их радиусов
+        self.region_scheduler: RegionScheduler | None = None
+        self.shard_coordinator: ShardCoordinator | None = None
+        self.checkpoint_writer: CheckpointWriter | None = None
+        # задается при CREATURE_ENGINE == "arrays", тогда существа обрабатываются им, а не регионами
+        self.creature_engine: CreatureEngine | None = None
+        # задается при SCREAM_PROPAGATION == "regions"
+        self.region_screams: RegionScreams | None = None
+        # массивы TopologyCache, нужны для ленивого создания регионов и тайлов и для CreatureEngine
+        self.geometry: dict[str, np.ndarray] | None = None
+        # отображение мира, задается окном, в симуляции без окна отсутствует
+        self.map: Map | None = None
         self.prepare()
 
     def start(self) -> None:
-        indexes = set(x.coordinates for x in self.tile_set)
-        for _ in range(self.bases_number):
-            center_index = random.choice(list(indexes))
-            center_tile = self.tiles_2[center_index.x][center_index.y]
-            base = Base(center_tile, self.age)
+        """Размещает базы и существа
 
-            base_indexes = set()
-            base_indexes.add(base.center_tile.coordinates)
-            base_indexes = Coordinates.append_layers(self.tiles_2, base_indexes, base.radius)
-            base.init(self.tiles_2[index.x][index.y] for index in base_indexes)
-            occupied_indexes = Coordinates.append_layers(self.tiles_2, base_indexes, base.radius)
+        Размещение при том же seed отличается от исходной версии: там тайлы выбирались из глобального random,
+        числа которого расходовали и конструкторы объектов, а теперь у объектов свои потоки.
+        """
 
-            indexes.difference_update(occupied_indexes)
+        # тайлы выбираются в порядке номеров - по спирали от центра, тайлы лениво материализуемого мира не создаются
+        indexes = self.tiles.indexes_array
+        free_tiles = FreeTiles(np.sort(indexes[indexes >= 0]))
+        for _ in range(self.bases_number):
+            if len(free_tiles) == 0:
+                raise ValueError(f"Not enough free tiles for {self.bases_number} bases")
+            center_tile = self.tiles[free_tiles.get(self.random_generator.randrange(len(free_tiles)))]
+            base = Base(center_tile, self.age, self.random_key, self.ids.allocate(Base), self.ids.allocate(Move))
+            base.randomize()
+
+            base.init(self.tiles[x] for x in np.unique(self.get_range_tile_indexes(center_tile, base.radius)).tolist())
+            free_tiles.remove(self.get_range_tile_indexes(center_tile, base.radius * 2))
             self.bases.append(base)
-            center_tile.region.bases.append(base)
+            self.bases_by_id[base.id] = base
+            center_tile.region.add_object(base)
 
-        indexes = list(indexes)
         for _ in range(self.population):
-            list_index = random.randint(0, len(indexes) - 1)
-            center_index = indexes.pop(list_index)
-            center_tile = self.tiles_2[center_index.x][center_index.y]
-            creature = Creature(center_tile, self.age, self.bases)
-
-            creature.init(self.tiles_2[index.x][index.y] for index in {center_index})
+            if len(free_tiles) == 0:
+                raise ValueError(f"Not enough free tiles for population {self.population}")
+            center_tile = self.tiles[free_tiles.pop(self.random_generator.randrange(len(free_tiles)))]
+            creature = Creature(
+                center_tile,
+                self.age,
+                self.random_key,
+                self.bases,
+                self.ids.allocate(Creature),
+                self.ids.allocate(Move)
+            )
+            creature.randomize()
+
+            creature.init((center_tile,))
             self.creatures.append(creature)
-            center_tile.region.creatures.append(creature)
+            center_tile.region.add_object(creature)
+        self.start_simulation()
+
+    def start_simulation(self) -> None:
+        """Части мира, зависящие от размещенных объектов, - общие для нового и восстановленного из снимка мира"""
+
+        self.audience.init(
+            self.creatures,
+            self.bases,
+            self.population,
+            np.asarray(self.geometry["tile_regions"])[self.tiles.indexes_array],
+            self.regions.coordinates_array
+        )
+
+        self.region_scheduler = RegionScheduler(
+            self.regions,
+            self.get_interaction_offsets()[1],
+            self.settings.SIMULATION_THREADS
+        )
+        if self.settings.SCREAM_PROPAGATION == "regions":
+            self.region_screams = RegionScreams(self)
+        if self.settings.CREATURE_ENGINE == "arrays":
+            self.creature_engine = CreatureEngine(self)
+            if self.settings.SIMULATION_PROCESSES > 1:
+                self.logger.warning("CreatureEngine runs in a single process, SIMULATION_PROCESSES is ignored")
+        elif self.settings.SIMULATION_PROCESSES > 1:
+            # шард - пара полос RegionScheduler
+            shards_number = min(self.settings.SIMULATION_PROCESSES, self.region_scheduler.bands_number // 2)
+            if shards_number < self.settings.SIMULATION_PROCESSES:
+                self.logger.warning(
+                    f"The map has {self.region_scheduler.bands_number} region bands,"
+                    f" {shards_number} of {self.settings.SIMULATION_PROCESSES} processes are used"
+                )
+            if shards_number > 1:
+                self.shard_coordinator = ShardCoordinator(self, shards_number)
+        if self.settings.CHECKPOINT_PERIOD > 0:
+            self.checkpoint_writer = CheckpointWriter(self.get_checkpoint_path())
+
+    def get_checkpoint_path(self) -> Path:
+        name = f"{self.world_radius}_{self.region_radius}_{self.seed}.checkpoint"
+        return Path(self.settings.CHECKPOINT_FOLDER) / name
+
+    def get_range_tile_indexes(self, center_tile: Tile, radius: int) -> np.ndarray:
+        """Номера тайлов в пределах radius шагов, с повторами, если радиус больше размера мира"""
+
+        coordinates = Coordinates.to_array(Coordinates.get_range_offsets(radius)) + center_tile.coordinates.to_2
+        keys = self.topology.get_cycle_keys(coordinates[:, 0], coordinates[:, 1])
+        return self.tiles.indexes_array[keys]
 
     def stop(self) -> None:
-        pass
+        if self.checkpoint_writer is not None:
+            self.checkpoint_writer.stop()
+        if self.shard_coordinator is not None:
+            self.shard_coordinator.stop()
+        if self.region_scheduler is not None:
+            self.region_scheduler.stop()
+
+    def get_arguments(self) -> tuple[int, int, int, int, float]:
+        """Аргументы, по которым в другом процессе строится такой же мир"""
+
+        return self.world_radius, self.region_radius, self.population, self.bases_number, self.seed
+
+    def get_interaction_offsets(self) -> tuple[tuple[Coordinates, ...], tuple[Coordinates, ...]]:
+        """Смещения регионов, объекты которых может затронуть обработка региона, начиная с нулевого,
+        и ненулевые смещения регионов, обработка которых может затронуть общие с ним объекты
+
+        Базы не перемещаются и затрагивают только себя. Существо начинает действие не дальше region_radius
+        от центра своего региона, сдвигается не больше чем на тайл, а затем кричит.
+        """
+
+        topology = self.topology
+        creatures_cry = self.settings.SCREAM_PROPAGATION == "creatures"
+        if creatures_cry and self.settings.SCREAM_LISTENERS == "layers":
+            # слушатели - существа регионов в пределах слоев вокруг региона кричащего,
+            # и еще один слой - до крика существо могло перейти в соседний регион
+            layers = topology.get_scream_layers(Creature.scream_radius) + 1
+            touched = Coordinates.get_range_offsets(layers, topology.region_unit)
+            conflicts = Coordinates.get_range_offsets(layers * 2, topology.region_unit)
+        else:
+            # тайлы, которые читает или меняет действие существа, не дальше reach от центра его региона
+            reach = self.region_radius + 1
+            if creatures_cry:
+                reach += Creature.scream_radius
+            touched = topology.get_region_offsets(reach + self.region_radius)
+            conflicts = topology.get_region_offsets(reach * 2)
+        return touched, conflicts[1:]
 
     def on_update(self, deta_time: int) -> None:
         self.age += deta_time
-        # todo: сделать обход, минимизирующий обработку соседних регионов одновременно при параллельной обработке
-        for region in self.region_set:
-            region.on_update(self.age, self.regions_2, self.bases)
-        for region in self.region_set:
+        if self.creature_engine is not None:
+            # регионы с существами не нужны - существа обрабатываются столбцами
+            self.region_scheduler.run(
+                set(x.center_tile.region for x in self.bases),
+                lambda region: region.update_bases(self.age, self.regions_2)
+            )
+            self.creature_engine.on_update(self.age)
+        elif self.shard_coordinator is not None:
+            # крики через регионы передают исполнители - каждый своим слушателям
+            self.shard_coordinator.on_update(deta_time)
+        else:
+            # объекты переходят между регионами во время обхода, поэтому RegionScheduler обходит копию
+            self.region_scheduler.run(
+                self.active_regions,
+                lambda region: region.on_update(self.age, self.regions_2, self.bases)
+            )
+            self.propagate_screams()
+        # отображаемые объекты должны совпадать с обработанными вне их каждый тик
+        if self.map is not None:
+            self.sync()
+        for region in sorted(self.active_regions):
             region.after_update()
+        # снимок снимается в потоке симуляции между тиками, записывается в фоне
+        if self.checkpoint_writer is not None and self.age % self.settings.CHECKPOINT_PERIOD == 0:
+            self.checkpoint_writer.submit(Checkpoint.capture(self))
+
+    def propagate_screams(self, listeners: np.ndarray = None) -> None:
+        """Крики тика через регионы, listeners - номера слушателей, по умолчанию - все существа мира"""
+
+        if self.region_screams is not None:
+            self.audience.propagate(self.region_screams, self.age, listeners)
+
+    def sync(self) -> None:
+        """Переносит в объекты мира состояние, обработанное вне их, - столбцами CreatureEngine или шардами"""
+
+        if self.creature_engine is not None:
+            self.creature_engine.sync()
+        if self.shard_coordinator is not None:
+            self.shard_coordinator.sync()
+
+    def restore_object(self, number: int, state: "State") -> Base | Creature:
+        """Создает объект с номером number в [*bases, *creatures] в состоянии state
+
+        Базы должны быть созданы раньше существ. Идентификаторы задаются номером, а не IdAllocator,
+        поэтому объекты можно создавать в любом порядке - при восстановлении из снимка и в шардах.
+        Случайные начальные значения не выбираются - они есть в состоянии.
+        """
+
+        center_tile = self.tiles[state[0]]
+        if number < self.bases_number:
+            world_object = Base(center_tile, self.age, self.random_key, number, number)
+            self.bases.append(world_object)
+            self.bases_by_id[world_object.id] = world_object
+        else:
+            world_object = Creature(
+                center_tile,
+                self.age,
+                self.random_key,
+                self.bases,
+                number - self.bases_number,
+                number
+            )
+            self.creatures.append(world_object)
+        # объект создан на своем центральном тайле, поэтому set_state не переносит его между регионами
+        world_object.set_state(state, self.tiles, self.bases_by_id)
+        world_object.occupy_tiles()
+        # состав региона определяется центральными тайлами объектов, порядок в регионе - идентификаторами
+        center_tile.region.add_object(world_object)
+        return world_object
 
-    # https://www.redblobgames.com/grids/hexagons/#map-storage
-    # todo: добавить сохранение/кэширование карты и соседей для более быстрой загрузки
     def prepare(self) -> None:
-        offset = self.region_radius * 2 + 1
-        region_centers = [Coordinates(0, 0)]
-        for layer in range(1, self.world_radius + 1):
-            for number in range(layer):
-                x = self.region_radius * layer + number * (self.region_radius + 1)
-                y = -(layer * offset - number * self.region_radius)
-                coordinates = Coordinates(x, y)
-                for _ in range(6):
-                    coordinates = coordinates.rotate_60()
-                    region_centers.append(coordinates)
-
-        for coordinates in region_centers:
-            region = Region(coordinates)
-            self.add_region(region)
-
-        for region in self.region_set:
-            region_indexes = self.get_region_indexes(region.coordinates)
-            region_tiles = set()
-            for tile_index in region_indexes:
-                tile = Tile(tile_index, region)
-                self.add_tile(tile)
-                region_tiles.add(tile)
-            region.tiles = region_tiles
+        cache = TopologyCache(self.world_radius, self.region_radius)
+        geometry = None
+        if self.settings.USE_TOPOLOGY_CACHE:
+            geometry = cache.load()
+        if geometry is None:
+            geometry = self.calculate_geometry()
+            if self.settings.USE_TOPOLOGY_CACHE:
+                cache.save(geometry)
+        self.build(geometry)
 
-        for region in self.region_set:
-            region.init(self.tiles_2, self.regions_2)
+    # https://www.redblobgames.com/grids/hexagons/#map-storage
+    def calculate_geometry(self) -> dict[str, np.ndarray]:
+        """Центры регионов, тайлы с их регионами и таблицы соседей в формате TopologyCache"""
+
+        region_centers = Coordinates.get_range_offsets(self.world_radius, self.topology.region_unit)
+        tile_offsets = Coordinates.get_range_offsets(self.region_radius)
+
+        tile_coordinates = []
+        tile_regions = []
+        for region_index, region_center in enumerate(region_centers):
+            for offset in tile_offsets:
+                tile_coordinates.append(region_center + offset)
+                tile_regions.append(region_index)
+
+        region_centers = Coordinates.to_array(region_centers)
+        tile_coordinates = Coordinates.to_array(tile_coordinates)
+        geometry = {
+            "region_centers": region_centers,
+            "tile_coordinates": tile_coordinates,
+            "tile_regions": np.array(tile_regions, dtype = np.int32),
+            "region_neighbours": self.get_neighbour_table(region_centers, self.topology.region_neighbour_offsets),
+            "tile_neighbours": self.get_neighbour_table(tile_coordinates, list(NEIGHBOUR_OFFSETS.values()))
+        }
+        return geometry
+
+    def get_neighbour_table(self, coordinates: np.ndarray, offsets: list[Coordinates]) -> np.ndarray:
+        indexes = np.full(self.topology.size, -1, dtype = np.int32)
+        indexes[self.topology.get_cycle_keys(coordinates[:, 0], coordinates[:, 1])] = np.arange(
+            len(coordinates),
+            dtype = np.int32
+        )
+        return self.topology.get_neighbour_table(coordinates, indexes, offsets)
+
+    def build(self, geometry: dict[str, np.ndarray]) -> None:
+        self.geometry = geometry
+        if self.settings.LAZY_REGIONS:
+            self.build_lazy(geometry)
+            return
+
+        for x, y in geometry["region_centers"].tolist():
+            region = Region(Coordinates(x, y), self.topology, self.active_regions, self.audience)
+            region.tiles = []
+            self.add_region(region)
 
-        for tile in self.tile_set:
-            tile.init(self.tiles_2)
+        for (x, y), region_index in zip(geometry["tile_coordinates"].tolist(), geometry["tile_regions"].tolist()):
+            region = self.regions[region_index]
+            tile = Tile(Coordinates(x, y), region)
+            self.add_tile(tile)
+            region.tiles.append(tile)
+        self.topology.set_cycle_table(geometry["tile_coordinates"])
+
+        self.topology.region_neighbours = geometry["region_neighbours"]
+        for region, neighbour_indexes in zip(self.regions, self.topology.region_neighbours.tolist()):
+            region.init([self.regions[index] for index in neighbour_indexes])
+
+        self.topology.tile_neighbours = geometry["tile_neighbours"]
+        for tile, neighbour_indexes in zip(self.tiles, self.topology.tile_neighbours.tolist()):
+            tile.init([self.tiles[index] for index in neighbour_indexes])
+
+    def build_lazy(self, geometry: dict[str, np.ndarray]) -> None:
+        """Создаются только индексы по геометрии, регионы и тайлы создаются при первом обращении к ним
+
+        Регион создается, когда попадает в радиус обзора или создаются его тайлы, тайлы региона - когда в регион
+        попадает объект или к ним обращаются соседние тайлы.
+        """
+
+        self.topology.region_neighbours = geometry["region_neighbours"]
+        self.topology.tile_neighbours = geometry["tile_neighbours"]
+        self.regions = LazyLatticeIndex[Region](
+            self.topology,
+            geometry["region_centers"],
+            self.topology.region_neighbours,
+            self.materialize_region
+        )
+        self.regions_2 = self.regions.view_2
+        self.tiles = LazyLatticeIndex[Tile](
+            self.topology,
+            geometry["tile_coordinates"],
+            self.topology.tile_neighbours,
+            self.materialize_tiles
+        )
+        self.tiles_2 = self.tiles.view_2
+        self.topology.set_cycle_table(geometry["tile_coordinates"])
+
+    def materialize_region(self, index: int) -> Region:
+        x, y = self.geometry["region_centers"][index].tolist()
+        region = Region(Coordinates(x, y), self.topology, self.active_regions, self.audience)
+        self.add_region(region)
+        return region
+
+    def materialize_tiles(self, index: int) -> Tile:
+        """Создает все тайлы региона, которому принадлежит тайл"""
+
+        region = self.regions[int(self.geometry["tile_regions"][index])]
+        # тайлы регионов идут подряд, по одинаковому количеству на регион
+        region_size = len(self.tiles) // len(self.regions)
+        first_index = region.index * region_size
+        region.tiles = []
+        for x, y in self.geometry["tile_coordinates"][first_index:first_index + region_size].tolist():
+            tile = Tile(Coordinates(x, y), region)
+            self.add_tile(tile)
+            region.tiles.append(tile)
+        return self.tiles.objects[index]
 
     def add_tile(self, tile: Tile) -> None:
-        self.tiles_2[tile.x][tile.y] = tile
-        self.tile_set.add(tile)
+        self.tiles.add(tile)
 
     def add_region(self, region: Region) -> None:
-        self.regions_2[region.x][region.y] = region
-        self.region_set.add(region)
-
-    def get_region_indexes(self, coordinates: Coordinates) -> set[Coordinates]:
-        indexes = set()
-        indexes.add(coordinates)
-        indexes = Coordinates.append_layers(self.tiles_2, indexes, self.region_radius, False)
-        return indexes
+        self.regions.add(region)
@@ -1,42 +1,116 @@
-import random
 from typing import Any, Iterable, TYPE_CHECKING
 
-from core.service.object import PhysicalObject, ProjectionObject
+from core.service.object import PhysicalObject
 from simulator.action import Move
+from simulator.counter_random import CounterRandom
 
 
 if TYPE_CHECKING:
-    from simulator.tile import Tile, TileProjection
+    from simulator.base import Base
+    from simulator.lattice import LatticeIndex
+    from simulator.projection import WorldObjectProjection
+    from simulator.tile import Tile
 
 
-class WorldObjectProjection(ProjectionObject):
-    tile_projection: "TileProjection"
+type State = tuple
 
 
 class WorldObject(PhysicalObject):
-    projection_class: type[WorldObjectProjection]
-    projections: dict["Tile", WorldObjectProjection]
     is_base = False
     is_creature = False
+    # длина части состояния, относящейся к WorldObject
+    state_length = 8
 
-    def __init__(self, center_tile: "Tile", time: int) -> None:
-        super().__init__()
+    def __init__(self, center_tile: "Tile", time: int, world_random_key: int, object_id: int, action_id: int) -> None:
+        super().__init__(object_id)
+        # собственный поток, чтобы результат не зависел от порядка, в котором объекты действуют,
+        # идентификаторы баз и существ отсчитываются отдельно, поэтому их потоки порождаются от разных ключей
+        kind_random_key = CounterRandom.get_stream_key(world_random_key, self.is_creature)
+        self.random_generator = CounterRandom(CounterRandom.get_stream_key(kind_random_key, self.id))
         self.center_tile = center_tile
-        self.tiles: set["Tile"] | None = None
+        self.topology = center_tile.region.topology
+        self.tiles: list["Tile"] | None = None
+        # создаются при отображении мира
+        self.projections: dict["Tile", "WorldObjectProjection"] | None = None
         self.age = 0
-        self.direction: int = random.randint(0, 5)
+        # задается в randomize или set_state
+        self.direction = 0
         self.resources = 0
         self.last_acting_time = time
         self.act_period = 10
         self.act_remainder = self.id % self.act_period
 
-        self.move = Move()
+        self.move = Move(action_id)
+
+    def randomize(self) -> None:
+        """Случайные начальные значения нового объекта, восстановленный объект получает их из состояния"""
+
+        self.direction = self.random_generator.randint(0, 5)
 
     def init(self, tiles: Iterable["Tile"]) -> Any:
-        self.tiles = set(tiles)
-        self.projections = {}
+        self.tiles = list(tiles)
+        self.occupy_tiles()
+
+    def occupy_tiles(self) -> None:
         for tile in self.tiles:
             tile.object = self
-            projection = self.projection_class()
-            self.projections[tile] = projection
-            projection.tile_projection = tile.projection
+
+    def release_tiles(self) -> None:
+        for tile in self.tiles:
+            if tile.object is self:
+                tile.object = None
+
+    def relocate(self, center_tile: "Tile", tiles: list["Tile"]) -> None:
+        """Перемещает объект на свободные тайлы, tiles - новые тайлы в порядке старых"""
+
+        self.release_tiles()
+        for tile in tiles:
+            tile.object = self
+
+        # проекции есть только у отображаемого мира
+        if self.projections is not None:
+            projections = {}
+            for old_tile, tile in zip(self.tiles, tiles):
+                projection = self.projections[old_tile]
+                projection.tile_projection = tile.projection
+                projection.position = tile.projection.position
+                projections[tile] = projection
+            self.projections = projections
+
+        old_region = self.center_tile.region
+        self.center_tile = center_tile
+        new_region = center_tile.region
+        self.tiles = tiles
+
+        if old_region != new_region:
+            old_region.remove_object(self)
+            new_region.add_object(self)
+
+    def get_state(self) -> State:
+        """Изменяемая во время тика часть объекта, объекты мира заменены номерами"""
+
+        return (
+            self.center_tile.index,
+            tuple(x.index for x in self.tiles),
+            self.direction,
+            self.last_acting_time,
+            self.age,
+            self.resources,
+            self.move.timer,
+            self.random_generator.counter
+        )
+
+    def set_state(self, state: State, tiles: "LatticeIndex[Tile]", bases_by_id: dict[int, "Base"]) -> None:
+        """Занятость тайлов не меняется - для этого есть release_tiles и occupy_tiles"""
+
+        (center_index, tile_indexes, self.direction, self.last_acting_time, self.age, self.resources,
+         self.move.timer, random_counter) = state
+        self.random_generator.seek(random_counter)
+
+        old_region = self.center_tile.region
+        self.center_tile = tiles[center_index]
+        self.tiles = [tiles[x] for x in tile_indexes]
+        new_region = self.center_tile.region
+        if old_region != new_region:
+            old_region.remove_object(self)
+            new_region.add_object(self)
@@ -0,0 +1,59 @@
+from typing import Any, Callable, Iterable
+
+import pytest
+
+from core.service.settings import Settings
+from simulator.world import World
+
+
+type States = list[tuple]
+type RunVariants = Callable[[Iterable[dict[str, Any]], tuple, int, int | None], list[list[States]]]
+
+
+@pytest.fixture(autouse = True)
+def settings(tmp_path) -> Settings:
+    """Настройки по умолчанию на время теста - Settings() заново выполняет __init__ и сбрасывает значения
+
+    Кэш топологии пишется во временную папку теста, чтобы тесты не зависели от кэшей предыдущих запусков.
+    """
+
+    settings = Settings()
+    settings.TOPOLOGY_CACHE_FOLDER = str(tmp_path)
+    yield settings
+    Settings()
+
+
+def get_states(world: World) -> States:
+    world.sync()
+    return [x.get_state() for x in [*world.bases, *world.creatures]]
+
+
+@pytest.fixture
+def run_variants(settings) -> RunVariants:
+    """Для каждого набора настроек создает мир World(*world_arguments), выполняет ticks тиков
+    и возвращает состояния объектов через каждые period тиков, по умолчанию - в конце"""
+
+    def run(
+            variants: Iterable[dict[str, Any]],
+            world_arguments: tuple,
+            ticks: int,
+            period: int | None = None
+    ) -> list[list[States]]:
+        if period is None:
+            period = ticks
+        states = []
+        for variant in variants:
+            for name, value in variant.items():
+                setattr(settings, name, value)
+            world = World(*world_arguments)
+            world.start()
+            run_states = []
+            for tick in range(1, ticks + 1):
+                world.on_update(1)
+                if tick % period == 0:
+                    run_states.append(get_states(world))
+            world.stop()
+            states.append(run_states)
+        return states
+
+    return run
@@ -0,0 +1,51 @@
+import pytest
+
+from simulator.world import World
+
+
+@pytest.mark.parametrize("listeners", ("layers", "radius"))
+def test_batched_cry_matches_cry_each(run_variants, listeners) -> None:
+    # все крики векторно и все крики по одному существу
+    states = run_variants(
+        ({"SCREAM_LISTENERS": listeners, "CRY_BATCH_SIZE": x} for x in (0, 10 ** 9)),
+        (5, 3, 300, 3, 1),
+        20
+    )
+
+    assert states[0] == states[1]
+
+
+@pytest.mark.parametrize("listeners", ("layers", "radius"))
+def test_split_regions_match_merged(run_variants, listeners) -> None:
+    # все регионы по тайлам, регионы делятся и сливаются, все регионы по множествам существ
+    states = run_variants(
+        ({"SCREAM_LISTENERS": listeners, "CRY_SPLIT_SIZE": x} for x in (0, 4, 10 ** 9)),
+        (5, 3, 300, 3, 1),
+        20
+    )
+
+    assert states[0] == states[1] == states[2]
+
+
+def test_regions_split_and_merge(settings) -> None:
+    settings.CRY_SPLIT_SIZE = 4
+    world = World(5, 3, 300, 3, 1)
+    world.start()
+    audience = world.audience
+    for _ in range(20):
+        world.on_update(1)
+        for region in world.regions:
+            count = len(region.creatures)
+            assert audience.region_rows[region.index] == {x.id for x in region.creatures}
+            assert count >= 2 if audience.region_split[region.index] else count <= 4
+    world.stop()
+
+    region = max(world.regions, key = lambda x: len(x.creatures))
+    creatures = list(region.creatures)
+    # регион сливается только ниже половины порога, а делится выше порога
+    for number, creature in enumerate(creatures, 1):
+        audience.remove(creature)
+        assert audience.region_split[region.index] == (len(creatures) - number >= 2)
+    for number, creature in enumerate(creatures, 1):
+        audience.add(creature)
+        assert audience.region_split[region.index] == (number > 4)
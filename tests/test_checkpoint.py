@@ -0,0 +1,54 @@
+import pytest
+
+from conftest import get_states
+from simulator.checkpoint import Checkpoint
+from simulator.world import World
+
+
+@pytest.mark.parametrize("engine", ("objects", "arrays"))
+def test_restored_world_matches_uninterrupted(settings, tmp_path, engine) -> None:
+    settings.CREATURE_ENGINE = engine
+    path = tmp_path / "world.checkpoint"
+    world = World(5, 3, 300, 3, 1)
+    world.start()
+    for _ in range(10):
+        world.on_update(1)
+
+    Checkpoint.capture(world).save(path)
+    restored = Checkpoint.load(path).restore()
+    assert restored.age == world.age
+    assert get_states(restored) == get_states(world)
+
+    for _ in range(20):
+        world.on_update(1)
+        restored.on_update(1)
+    world.stop()
+    restored.stop()
+
+    assert get_states(restored) == get_states(world)
+
+
+def test_checkpoint_of_other_version_is_rejected(settings, tmp_path) -> None:
+    path = tmp_path / "world.checkpoint"
+    world = World(5, 3, 30, 3, 1)
+    world.start()
+    checkpoint = Checkpoint.capture(world)
+    world.stop()
+    checkpoint.header[0] += 1
+    checkpoint.save(path)
+
+    with pytest.raises(ValueError, match = "is not supported"):
+        Checkpoint.load(path)
+
+
+def test_truncated_checkpoint_is_rejected(settings, tmp_path) -> None:
+    path = tmp_path / "world.checkpoint"
+    world = World(5, 3, 30, 3, 1)
+    world.start()
+    Checkpoint.capture(world).save(path)
+    world.stop()
+    with open(path, "r+b") as file:
+        file.truncate(path.stat().st_size - 100)
+
+    with pytest.raises(ValueError, match = "is truncated"):
+        Checkpoint.load(path)
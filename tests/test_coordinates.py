@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from core.service.coordinates import Coordinates
+from simulator.world import World
+
+
+@pytest.fixture
+def world(settings) -> World:
+    return World(3, 2, 10, 1, 0)
+
+
+def get_mirror_shifts(world: World, number: int) -> list[Coordinates]:
+    """Сдвиги на целые комбинации двух соседних зеркальных центров, не больше number каждого"""
+
+    first, second = world.topology.mirror_centers[:2]
+    return [first * x + second * y for x in range(-number, number + 1) for y in range(-number, number + 1)]
+
+
+def test_fix_to_cycle_matches_mirror_search(world) -> None:
+    generator = random.Random(0)
+    tiles = {(x.x, x.y) for x in world.tiles}
+    shifts = get_mirror_shifts(world, 8)
+    radius = world.radius * 4
+
+    for _ in range(300):
+        point = Coordinates(generator.randint(-radius, radius), generator.randint(-radius, radius))
+        images = [point - x for x in shifts if (point.x - x.x, point.y - x.y) in tiles]
+        assert images == [point.fix_to_cycle(world.topology)]
+
+
+def test_distance_3_matches_mirror_search(world) -> None:
+    generator = random.Random(0)
+    tiles = list(world.tiles)
+    shifts = get_mirror_shifts(world, 2)
+
+    for _ in range(300):
+        first, second = (x.coordinates for x in generator.sample(tiles, 2))
+        expected = min(first.distance_3(second + x) for x in shifts)
+        assert first.distance_3(second, world.topology) == expected
+        assert second.distance_3(first, world.topology) == expected
+
+
+@pytest.mark.parametrize("cycled", (False, True))
+def test_batch_indexes_match_distance_3(world, cycled) -> None:
+    generator = random.Random(0)
+    topology = world.topology if cycled else None
+    tiles = [x.coordinates for x in world.tiles]
+    origins = generator.sample(tiles, 5)
+    targets = generator.sample(tiles, 40)
+    targets_array = Coordinates.to_array(targets)
+
+    expected_closest = []
+    for origin in origins:
+        distances = [origin.distance_3(x, topology) for x in targets]
+        expected_closest.append(min(range(len(targets)), key = lambda x: distances[x]))
+        for reverse in (False, True):
+            expected = sorted(range(len(targets)), key = lambda x: distances[x], reverse = reverse)
+            indexes = Coordinates.get_sorted_indexes(origin.to_2, targets_array, topology, reverse)
+            assert indexes.tolist() == expected
+
+        assert Coordinates.get_closest_indexes(origin.to_2, targets_array, topology) == expected_closest[-1]
+
+    origins_array = Coordinates.to_array(origins)
+    assert Coordinates.get_closest_indexes(origins_array, targets_array, topology).tolist() == expected_closest
+    for reverse in (False, True):
+        indexes = Coordinates.get_sorted_indexes(origins_array, targets_array, topology, reverse)
+        assert indexes.tolist() == [
+            Coordinates.get_sorted_indexes(x.to_2, targets_array, topology, reverse).tolist() for x in origins
+        ]
@@ -0,0 +1,20 @@
+import numpy as np
+
+from simulator.counter_random import CounterRandom
+
+
+def test_blocks_match_random_array(settings) -> None:
+    settings.RANDOM_BLOCK_SIZE = 16
+    key = CounterRandom.get_stream_key(1, 2)
+    expected = CounterRandom.random_array(np.full(100, key, dtype = np.uint64), np.arange(1, 101)).tolist()
+    generator = CounterRandom(key)
+    # несколько блоков подряд
+    assert [generator.random() for _ in range(40)] == expected[:40]
+    assert generator.counter == 40
+
+    # номер задан снаружи - внутри текущего блока, за ним и до него
+    for counter in (45, 47, 80, 3):
+        generator.seek(counter)
+        assert [generator.random() for _ in range(20)] == expected[counter:counter + 20]
+        assert generator.counter == counter + 20
+    assert CounterRandom(key, 7).random() == expected[7]
@@ -0,0 +1,109 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from conftest import get_states
+from simulator.world import World
+
+
+@pytest.mark.parametrize(
+    ("listeners", "screams"),
+    (("layers", "creatures"), ("radius", "creatures"), ("layers", "regions"), ("radius", "regions"))
+)
+def test_arrays_engine_matches_objects(run_variants, listeners, screams) -> None:
+    # период действия существ - 10 тиков, а остаток - идентификатор, поэтому за тик действует одно существо;
+    # когда существ тика несколько, CreatureEngine сначала двигает их все, а затем все они кричат
+    states = run_variants(
+        (
+            {"SCREAM_LISTENERS": listeners, "SCREAM_PROPAGATION": screams, "CREATURE_ENGINE": x}
+            for x in ("objects", "arrays")
+        ),
+        (5, 3, 10, 3, 1),
+        400,
+        10
+    )
+
+    assert states[0] == states[1]
+    # существа слышали крики друг друга
+    assert any(x[-5] is not None for objects_states in states[0] for x in objects_states[3:])
+
+
+def assert_occupancy(world: World) -> None:
+    """Каждый тайл занят не больше чем одним объектом, занятость и регионы совпадают с тайлами объектов"""
+
+    objects = [*world.bases, *world.creatures]
+    occupied = [tile for x in objects for tile in x.tiles]
+    assert len(set(occupied)) == len(occupied)
+    assert {x for x in world.tiles if x.object is not None} == set(occupied)
+    for world_object in objects:
+        assert world_object.center_tile in world_object.tiles
+        assert all(x.object is world_object for x in world_object.tiles)
+    assert [x for region in world.regions for x in region.creatures] == sorted(
+        world.creatures,
+        key = lambda x: (x.center_tile.region.index, x.id)
+    )
+
+
+@pytest.mark.parametrize(
+    ("listeners", "screams"),
+    (("layers", "creatures"), ("radius", "creatures"), ("layers", "regions"), ("radius", "regions"))
+)
+def test_arrays_engine_keeps_occupancy_under_contention(settings, listeners, screams) -> None:
+    # за тик действует 60 существ у двух баз: существа претендуют на одни тайлы, сдвигаются цепочками
+    # и обходят друг друга, поэтому результат отличается от обработки объектов, где существа действуют по очереди
+    settings.SCREAM_LISTENERS = listeners
+    settings.SCREAM_PROPAGATION = screams
+    worlds = []
+    for engine in ("objects", "arrays"):
+        settings.CREATURE_ENGINE = engine
+        world = World(5, 3, 600, 2, 1)
+        world.start()
+        worlds.append(world)
+    objects_world, arrays_world = worlds
+    engine = arrays_world.creature_engine
+    rows = np.arange(len(arrays_world.creatures))
+
+    for _ in range(30):
+        for world in worlds:
+            world.on_update(1)
+
+        assert len(np.unique(engine.tiles)) == len(engine.tiles)
+        assert np.array_equal(engine.occupants[engine.tiles], len(arrays_world.bases) + rows)
+        arrays_world.sync()
+        occupants = np.full(len(arrays_world.tiles), -1, dtype = np.int64)
+        for number, world_object in enumerate([*arrays_world.bases, *arrays_world.creatures]):
+            occupants[[x.index for x in world_object.tiles]] = number
+        assert np.array_equal(engine.occupants, occupants)
+        assert engine.tiles.tolist() == [x.center_tile.index for x in arrays_world.creatures]
+        for world in worlds:
+            assert_occupancy(world)
+
+        # базы и время действий существ от порядка действий не зависят
+        objects_states, arrays_states = (get_states(x) for x in worlds)
+        bases_number = len(objects_world.bases)
+        assert objects_states[:bases_number] == arrays_states[:bases_number]
+        assert [x[3:5] for x in objects_states] == [x[3:5] for x in arrays_states]
+    for world in worlds:
+        world.stop()
+    # существа слышали крики друг друга
+    assert np.isfinite(engine.heard_distances).any()
+
+
+def test_free_directions_prefer_right_then_left_then_around(settings) -> None:
+    settings.CREATURE_ENGINE = "arrays"
+    world = World(5, 3, 10, 1, 1)
+    world.start()
+    engine = world.creature_engine
+    neighbours = engine.tile_neighbours[engine.tiles[0]]
+    direction = int(engine.directions[0])
+
+    for occupied in itertools.product((False, True), repeat = 3):
+        expected = -1
+        # как в Creature.act и Creature.reflect_direction: направо, налево, назад
+        for turn, is_occupied in reversed(tuple(zip((1, 5, 3), occupied))):
+            engine.occupants[neighbours[(direction + turn) % 6]] = len(world.bases) + 1 if is_occupied else -1
+            if not is_occupied:
+                expected = (direction + turn) % 6
+        assert engine.get_free_directions(np.array([0])).tolist() == [expected]
+    world.stop()
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from simulator.world import World
+
+
+def test_lazy_world_has_eager_geometry(settings) -> None:
+    eager = World(5, 3, 10, 1, 0)
+    settings.LAZY_REGIONS = True
+    lazy = World(5, 3, 10, 1, 0)
+
+    for name in ("tiles", "regions"):
+        eager_index, lazy_index = getattr(eager, name), getattr(lazy, name)
+        assert len(lazy_index) == len(eager_index)
+        assert np.array_equal(lazy_index.coordinates_array, eager_index.coordinates_array)
+        assert np.array_equal(lazy_index.indexes_array, eager_index.indexes_array)
+    # объекты лениво создаются по номеру
+    assert not any(lazy.tiles.objects)
+    for index in (0, len(eager.tiles) // 2, len(eager.tiles) - 1):
+        tile = lazy.tiles[index]
+        assert (tile.index, tile.x, tile.y) == (index, eager.tiles[index].x, eager.tiles[index].y)
+        assert tile.region.index == eager.tiles[index].region.index
+        assert [x.index for x in tile.neighbours] == [x.index for x in eager.tiles[index].neighbours]
+
+
+@pytest.mark.parametrize("listeners", ("layers", "radius"))
+def test_lazy_world_matches_eager(run_variants, listeners) -> None:
+    states = run_variants(
+        ({"SCREAM_LISTENERS": listeners, "LAZY_REGIONS": x} for x in (False, True)),
+        (5, 3, 300, 3, 1),
+        30,
+        10
+    )
+
+    assert states[0] == states[1]
@@ -0,0 +1,37 @@
+import random
+
+import numpy as np
+import pytest
+
+from simulator.placement import FreeTiles
+from simulator.world import World
+
+
+def test_free_tiles_match_list() -> None:
+    generator = random.Random(0)
+    order = np.array(generator.sample(range(200), 200), dtype = np.int64)
+    free_tiles = FreeTiles(order)
+    # тот же порядок выбора, удаление за O(N)
+    expected = order.tolist()
+
+    while expected:
+        assert len(free_tiles) == len(expected)
+        number = generator.randrange(len(expected))
+        assert free_tiles.get(number) == expected[number]
+        if generator.random() < 0.5:
+            assert free_tiles.pop(number) == expected.pop(number)
+        else:
+            # удаление уже занятых тайлов ничего не меняет
+            removed = generator.choices(order.tolist(), k = 5)
+            free_tiles.remove(np.array(removed, dtype = np.int64))
+            expected = [x for x in expected if x not in removed]
+
+    assert len(free_tiles) == 0
+
+
+@pytest.mark.parametrize(("population", "bases_number"), ((10 ** 4, 1), (10, 10 ** 4)))
+def test_not_enough_free_tiles(settings, population, bases_number) -> None:
+    world = World(3, 3, population, bases_number, 0)
+
+    with pytest.raises(ValueError, match = "Not enough free tiles"):
+        world.start()
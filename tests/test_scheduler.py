@@ -0,0 +1,76 @@
+import pytest
+
+from core.service.coordinates import ABSOLUTE_CENTER
+from simulator.creature import Creature
+from simulator.world import World
+
+
+@pytest.mark.parametrize(
+    ("listeners", "screams"),
+    (("layers", "creatures"), ("radius", "creatures"), ("layers", "regions"))
+)
+def test_conflicting_regions_get_different_colors(settings, listeners, screams) -> None:
+    settings.SCREAM_LISTENERS = listeners
+    settings.SCREAM_PROPAGATION = screams
+    world = World(5, 3, 50, 2, 0)
+    world.start()
+    scheduler = world.region_scheduler
+
+    for index, neighbours in enumerate(scheduler.conflicts.tolist()):
+        for neighbour in neighbours:
+            if neighbour != index:
+                assert scheduler.colors[index] != scheduler.colors[neighbour]
+
+
+def test_radius_conflicts_match_reach(settings) -> None:
+    settings.SCREAM_LISTENERS = "radius"
+    # карта больше области конфликтов, иначе конфликтуют все регионы
+    world = World(10, 3, 50, 2, 0)
+    world.start()
+    topology = world.topology
+    # начало действия, шаг и крик
+    reach = world.region_radius + 1 + Creature.scream_radius
+
+    conflicts = world.region_scheduler.conflicts.tolist()
+    for region in world.regions:
+        expected = {
+            x.index for x in world.regions
+            if x is not region and region.coordinates.distance_3(x.coordinates, topology) <= reach * 2
+        }
+        assert set(conflicts[region.index]) - {region.index} == expected
+
+
+def test_interaction_offsets_start_with_region(settings) -> None:
+    world = World(4, 3, 10, 1, 0)
+
+    touched, conflicts = world.get_interaction_offsets()
+
+    assert touched[0] == ABSOLUTE_CENTER
+    assert ABSOLUTE_CENTER not in conflicts
+
+
+@pytest.mark.parametrize(
+    ("listeners", "screams"),
+    (("layers", "creatures"), ("radius", "creatures"), ("layers", "regions"), ("radius", "regions"))
+)
+def test_threads_match_serial(run_variants, listeners, screams) -> None:
+    states = run_variants(
+        ({"SCREAM_LISTENERS": listeners, "SCREAM_PROPAGATION": screams, "SIMULATION_THREADS": x} for x in (1, 3)),
+        (5, 3, 300, 3, 1),
+        30
+    )
+
+    assert states[0] == states[1]
+
+
+@pytest.mark.parametrize("listeners", ("layers", "radius"))
+def test_conflicting_regions_are_in_neighbour_bands(settings, listeners) -> None:
+    settings.SCREAM_LISTENERS = listeners
+    world = World(10, 3, 50, 2, 0)
+    world.start()
+    scheduler = world.region_scheduler
+
+    for index, neighbours in enumerate(scheduler.conflicts.tolist()):
+        for neighbour in neighbours:
+            difference = abs(int(scheduler.bands[index]) - int(scheduler.bands[neighbour]))
+            assert min(difference, scheduler.bands_number - difference) <= 1
@@ -0,0 +1,42 @@
+import pytest
+
+from simulator.world import World
+
+
+# карты, на которых больше двух полос регионов, чтобы шардов было больше одного,
+# при SCREAM_LISTENERS == "layers" полосы шире
+WORLD_ARGUMENTS = {"layers": (20, 6, 1000, 5, 3), "radius": (10, 5, 1000, 5, 3)}
+
+
+@pytest.mark.parametrize(
+    ("listeners", "screams"),
+    (("layers", "creatures"), ("radius", "creatures"), ("layers", "regions"), ("radius", "regions"))
+)
+def test_threads_and_shards_match_serial(run_variants, listeners, screams) -> None:
+    states = run_variants(
+        (
+            {
+                "SCREAM_LISTENERS": listeners,
+                "SCREAM_PROPAGATION": screams,
+                "SIMULATION_THREADS": threads,
+                "SIMULATION_PROCESSES": processes
+            }
+            for threads, processes in ((1, 1), (3, 1), (1, 2))
+        ),
+        WORLD_ARGUMENTS[listeners],
+        20,
+        10
+    )
+
+    assert states[0] == states[1] == states[2]
+
+
+@pytest.mark.parametrize("listeners", ("layers", "radius"))
+def test_shards_are_created(settings, listeners) -> None:
+    settings.SCREAM_LISTENERS = listeners
+    settings.SIMULATION_PROCESSES = 2
+    world = World(*WORLD_ARGUMENTS[listeners])
+    world.start()
+    world.stop()
+
+    assert world.shard_coordinator is not None
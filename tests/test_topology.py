@@ -0,0 +1,42 @@
+import numpy as np
+
+from core.service.topology import TopologyCache
+from simulator.world import World
+
+
+def test_topology_cache_loads_saved_geometry(settings) -> None:
+    cache = TopologyCache(3, 2)
+    assert cache.load() is None
+
+    # мир без кэша рассчитывает геометрию и сохраняет ее
+    geometry = World(3, 2, 10, 1, 0).geometry
+    loaded = cache.load()
+
+    assert loaded is not None
+    for name in TopologyCache.array_names:
+        assert loaded[name].dtype == geometry[name].dtype
+        assert np.array_equal(loaded[name], geometry[name])
+    # следующий мир берет геометрию из кэша
+    assert isinstance(World(3, 2, 10, 1, 0).geometry["tile_coordinates"], np.memmap)
+
+
+def test_topology_cache_rejects_other_version(settings) -> None:
+    cache = TopologyCache(3, 2)
+    cache.save(World(3, 2, 10, 1, 0).geometry)
+    cache.version += 1
+
+    assert cache.load() is None
+
+
+def test_topology_cache_rejects_truncated_file(settings) -> None:
+    cache = TopologyCache(3, 2)
+    geometry = World(3, 2, 10, 1, 0).geometry
+    size = cache.path.stat().st_size
+    with open(cache.path, "r+b") as file:
+        file.truncate(size - 100)
+
+    assert cache.load() is None
+    # мир рассчитывает геометрию заново и перезаписывает кэш
+    assert np.array_equal(World(3, 2, 10, 1, 0).geometry["tile_neighbours"], geometry["tile_neighbours"])
+    assert cache.path.stat().st_size == size
+    assert cache.load() is not None